@@ -0,0 +1,97 @@
+"""
+Benchmark of queue backends used by EventEngine, compared with queue.Queue.
+"""
+
+from queue import Queue, Empty
+from threading import Event as ThreadEvent, Thread
+from time import perf_counter
+
+from vnpy.event import Event, EventEngine, LaneQueue, LockFreeQueue
+
+
+PRODUCERS: int = 4
+COUNT: int = 200_000
+
+
+def run_queue(name: str, queue: Queue | LaneQueue | LockFreeQueue) -> None:
+    """
+    Put items from several producer threads and get them out from one consumer.
+    """
+    total: int = PRODUCERS * COUNT
+    event: Event = Event("eTick.")
+
+    def produce() -> None:
+        for _ in range(COUNT):
+            queue.put(event)
+
+    producers: list[Thread] = [Thread(target=produce) for _ in range(PRODUCERS)]
+
+    start: float = perf_counter()
+
+    for thread in producers:
+        thread.start()
+
+    received: int = 0
+    while received < total:
+        try:
+            queue.get(timeout=1)
+            received += 1
+        except Empty:
+            pass
+
+    for thread in producers:
+        thread.join()
+
+    cost: float = perf_counter() - start
+    print(f"{name:<16}{total / cost:>14,.0f} items/s")
+
+
+def run_engine(name: str, engine: EventEngine) -> None:
+    """
+    Measure throughput of event engine from put to handler.
+    """
+    total: int = PRODUCERS * COUNT
+    received: list[int] = [0]
+    finished: ThreadEvent = ThreadEvent()
+
+    def handle(event: Event) -> None:
+        received[0] += 1
+        if received[0] == total:
+            finished.set()
+
+    engine.register("eTick.", handle)
+    engine.start()
+
+    event: Event = Event("eTick.")
+
+    def produce() -> None:
+        for _ in range(COUNT):
+            engine.put(event)
+
+    producers: list[Thread] = [Thread(target=produce) for _ in range(PRODUCERS)]
+
+    start: float = perf_counter()
+
+    for thread in producers:
+        thread.start()
+
+    for thread in producers:
+        thread.join()
+
+    finished.wait()
+
+    cost: float = perf_counter() - start
+    print(f"{name:<16}{total / cost:>14,.0f} events/s")
+
+    engine.stop()
+
+
+if __name__ == "__main__":
+    print(f"Queue backends ({PRODUCERS} producers, 1 consumer)")
+    run_queue("Queue", Queue())
+    run_queue("LaneQueue", LaneQueue())
+    run_queue("LockFreeQueue", LockFreeQueue())
+
+    print(f"EventEngine ({PRODUCERS} producers)")
+    run_engine("LaneQueue", EventEngine())
+    run_engine("LockFreeQueue", EventEngine(queue_class=LockFreeQueue))
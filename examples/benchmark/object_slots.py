@@ -0,0 +1,84 @@
+"""
+Benchmark of memory and throughput of slotted TickData/BarData, compared
+with equivalent dataclasses using per-instance __dict__.
+"""
+
+import gc
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import MISSING, fields, make_dataclass
+from datetime import datetime
+from time import perf_counter
+
+from vnpy.trader.constant import Exchange
+from vnpy.trader.object import BarData, TickData
+
+
+COUNT: int = 200_000
+
+
+def make_dict_class(cls: type) -> type:
+    """
+    Create dataclass with same fields but without __slots__, whose
+    vt_symbol is formatted for every object.
+    """
+    specs: list = []
+    for f in fields(cls):
+        if not f.init:
+            continue
+
+        if f.default is MISSING:
+            specs.append((f.name, f.type))
+        else:
+            specs.append((f.name, f.type, f.default))
+
+    def __post_init__(self: object) -> None:
+        self.extra = None                                                   # type: ignore
+        self.vt_symbol = f"{self.symbol}.{self.exchange.value}"             # type: ignore
+
+    return make_dataclass(f"Dict{cls.__name__}", specs, namespace={"__post_init__": __post_init__})
+
+
+def run_class(name: str, create: Callable[[int], object]) -> None:
+    """
+    Measure memory per object, creation speed and attribute access speed.
+    """
+    gc.collect()
+    tracemalloc.start()
+    objects: list = [create(i) for i in range(COUNT)]
+    size: int = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    del objects
+    gc.collect()
+
+    start: float = perf_counter()
+    objects = [create(i) for i in range(COUNT)]
+    create_cost: float = perf_counter() - start
+
+    start = perf_counter()
+    total: float = 0
+    for obj in objects:
+        total += obj.last_price if hasattr(obj, "last_price") else obj.close_price
+        _ = obj.vt_symbol
+    access_cost: float = perf_counter() - start
+
+    print(
+        f"{name:<16}{size / COUNT:>10.0f} B"
+        f"{COUNT / create_cost:>14,.0f} /s{COUNT / access_cost:>14,.0f} /s"
+    )
+
+
+if __name__ == "__main__":
+    dt: datetime = datetime.now()
+    symbols: list[str] = [f"rb{2501 + i}" for i in range(100)]
+
+    DictTickData: type = make_dict_class(TickData)
+    DictBarData: type = make_dict_class(BarData)
+
+    print(f"{'':<16}{'memory':>12}{'create':>17}{'access':>17}")
+
+    run_class("DictTickData", lambda i: DictTickData("CTP", symbols[i % 100], Exchange.SHFE, dt, last_price=i))
+    run_class("TickData", lambda i: TickData("CTP", symbols[i % 100], Exchange.SHFE, dt, last_price=i))
+    run_class("DictBarData", lambda i: DictBarData("DB", symbols[i % 100], Exchange.SHFE, dt, close_price=i))
+    run_class("BarData", lambda i: BarData("DB", symbols[i % 100], Exchange.SHFE, dt, close_price=i))
@@ -0,0 +1,136 @@
+"""
+Benchmark of compressors used by RPC on synthetic contract and bar lists,
+and round trip time of querying them with and without compression.
+"""
+
+from datetime import datetime, timedelta
+from time import perf_counter, sleep
+
+from vnpy.trader.constant import Exchange, Interval, Product
+from vnpy.trader.object import BarData, ContractData
+from vnpy.rpc import RpcClient, RpcServer
+from vnpy.rpc.compressor import COMPRESSORS
+from vnpy.rpc.serializer import SERIALIZERS
+
+
+CONTRACT_COUNT: int = 20_000
+BAR_COUNT: int = 100_000
+
+REP_ADDRESS: str = "tcp://127.0.0.1:2114"
+PUB_ADDRESS: str = "tcp://127.0.0.1:4102"
+
+
+def generate_contracts() -> list[ContractData]:
+    """"""
+    return [
+        ContractData(
+            gateway_name="CTP",
+            symbol=f"rb{2501 + i % 12}C{3000 + i}",
+            exchange=Exchange.SHFE,
+            name=f"螺纹钢期权{i}",
+            product=Product.OPTION,
+            size=10,
+            pricetick=0.5,
+            min_volume=1,
+        )
+        for i in range(CONTRACT_COUNT)
+    ]
+
+
+def generate_bars() -> list[BarData]:
+    """"""
+    start: datetime = datetime(2024, 1, 2, 9)
+    price: float = 3500
+
+    bars: list[BarData] = []
+    for i in range(BAR_COUNT):
+        price += (i % 7 - 3) * 0.5
+        bars.append(BarData(
+            gateway_name="DB",
+            symbol="rb2501",
+            exchange=Exchange.SHFE,
+            datetime=start + timedelta(minutes=i),
+            interval=Interval.MINUTE,
+            volume=100 + i % 50,
+            turnover=(100 + i % 50) * price * 10,
+            open_interest=200000 + i,
+            open_price=price,
+            high_price=price + 2,
+            low_price=price - 2,
+            close_price=price + 0.5,
+        ))
+    return bars
+
+
+def run_compressors(name: str, data: list) -> None:
+    """
+    Measure size and speed of each serializer and compressor.
+    """
+    print(f"{name}")
+
+    for serializer in SERIALIZERS.values():
+        raw: bytes = serializer.pack(data)
+        print(f"  {serializer.name:<8}{'-':<8}{len(raw):>14,} bytes")
+
+        for compressor in COMPRESSORS.values():
+            start: float = perf_counter()
+            compressed: bytes = compressor.compress(raw)
+            compress_cost: float = perf_counter() - start
+
+            start = perf_counter()
+            compressor.decompress(compressed)
+            decompress_cost: float = perf_counter() - start
+
+            print(
+                f"  {serializer.name:<8}{compressor.name:<8}{len(compressed):>14,} bytes"
+                f"{compress_cost * 1000:>10.1f} ms{decompress_cost * 1000:>10.1f} ms"
+            )
+
+
+def run_rpc(contracts: list[ContractData], bars: list[BarData]) -> None:
+    """
+    Measure round trip time of querying lists through RPC.
+    """
+    server: RpcServer = RpcServer()
+
+    def get_all_contracts() -> list[ContractData]:
+        return contracts
+
+    def query_history() -> list[BarData]:
+        return bars
+
+    server.register(get_all_contracts)
+    server.register(query_history)
+    server.start(REP_ADDRESS, PUB_ADDRESS)
+
+    for serializer in SERIALIZERS:
+        for compression in [False, True]:
+            client: RpcClient = RpcClient(serializer, compression)
+            client.start(REP_ADDRESS, PUB_ADDRESS)
+            sleep(0.5)
+
+            for func in ["get_all_contracts", "query_history"]:
+                start: float = perf_counter()
+                getattr(client, func)()
+                cost: float = perf_counter() - start
+
+                label: str = client._compressor.name if client._compressor else "-"
+                print(f"  {serializer:<8}{label:<8}{func:<20}{cost * 1000:>10.1f} ms")
+
+            client.stop()
+            client.join()
+
+    server.stop()
+    server.join()
+
+
+if __name__ == "__main__":
+    contracts: list[ContractData] = generate_contracts()
+    bars: list[BarData] = generate_bars()
+
+    print(f"Serialized size and compress/decompress time ({', '.join(COMPRESSORS)})")
+    run_compressors(f"{CONTRACT_COUNT} contracts", contracts)
+    run_compressors(f"{BAR_COUNT} bars", bars)
+
+    print("RPC round trip over tcp loopback")
+    run_rpc(contracts, bars)
@@ -0,0 +1,73 @@
+"""
+Benchmark of RPC round trip latency over tcp, ipc and inproc transports.
+"""
+
+from concurrent.futures import Future
+from time import perf_counter, sleep
+
+import zmq
+
+from vnpy.rpc import RpcClient, RpcServer
+
+
+COUNT: int = 10_000
+
+TCP_ADDRESSES: tuple[str, str] = ("tcp://127.0.0.1:2114", "tcp://127.0.0.1:4102")
+INPROC_ADDRESSES: tuple[str, str] = ("inproc://rpc_rep", "inproc://rpc_pub")
+
+
+def echo(value: int) -> int:
+    """"""
+    return value
+
+
+def run_transport(name: str, addresses: tuple[str, str], ipc: bool, context: zmq.Context | None) -> None:
+    """
+    Measure latency of blocking calls and throughput of pipelined calls.
+    """
+    server: RpcServer = RpcServer(context=context)
+    server.register(echo)
+    server.start(*addresses, ipc=ipc)
+
+    client: RpcClient = RpcClient(context=context)
+    client.start(*addresses, ipc=ipc)
+    sleep(0.5)
+
+    # Warm up
+    for i in range(100):
+        client.echo(i)
+
+    costs: list[float] = []
+    for i in range(COUNT):
+        start: float = perf_counter()
+        client.echo(i)
+        costs.append(perf_counter() - start)
+
+    costs.sort()
+    p50: float = costs[COUNT // 2] * 1e6
+    p99: float = costs[int(COUNT * 0.99)] * 1e6
+    mean: float = sum(costs) / COUNT * 1e6
+
+    start = perf_counter()
+    futures: list[Future] = [client.call_future("echo", i) for i in range(COUNT)]
+    for future in futures:
+        future.result()
+    throughput: float = COUNT / (perf_counter() - start)
+
+    print(f"{name:<8}{mean:>10.1f}{p50:>10.1f}{p99:>10.1f}{throughput:>14,.0f}")
+
+    client.stop()
+    client.join()
+    server.stop()
+    server.join()
+
+
+if __name__ == "__main__":
+    print(f"{'':<8}{'mean(us)':>10}{'p50(us)':>10}{'p99(us)':>10}{'pipelined/s':>14}")
+
+    run_transport("tcp", TCP_ADDRESSES, False, None)
+
+    if zmq.has("ipc"):
+        run_transport("ipc", TCP_ADDRESSES, True, None)
+
+    run_transport("inproc", INPROC_ADDRESSES, False, zmq.Context())
@@ -8,7 +8,7 @@ from functools import lru_cache
 
 import polars as pl
 
-from vnpy.trader.object import BarData
+from vnpy.trader.object import BarData, BarBatch
 from vnpy.trader.constant import Interval
 from vnpy.trader.utility import extract_vt_symbol
 
@@ -101,6 +101,21 @@ class AlphaLab:
         end: datetime | str
     ) -> list[BarData]:
         """Load bar data"""
+        batch: BarBatch | None = self.load_bar_batch(vt_symbol, interval, start, end)
+        if not batch:
+            return []
+
+        # Convert to BarData objects
+        return batch.to_list()
+
+    def load_bar_batch(
+        self,
+        vt_symbol: str,
+        interval: Interval | str,
+        start: datetime | str,
+        end: datetime | str
+    ) -> BarBatch | None:
+        """Load bar data as columnar batch"""
         # Convert types
         if isinstance(interval, str):
             interval = Interval(interval)
@@ -115,13 +130,13 @@ class AlphaLab:
             folder_path = self.minute_path
         else:
             logger.error(f"Unsupported interval {interval.value}")
-            return []
+            return None
 
         # Check if file exists
         file_path: Path = folder_path.joinpath(f"{vt_symbol}.parquet")
         if not file_path.exists():
             logger.error(f"File {file_path} does not exist")
-            return []
+            return None
 
         # Open file
         df: pl.DataFrame = pl.read_parquet(file_path)
@@ -129,29 +144,17 @@ class AlphaLab:
         # Filter by date range
         df = df.filter((pl.col("datetime") >= start) & (pl.col("datetime") <= end))
 
-        # Convert to BarData objects
-        bars: list[BarData] = []
+        # Rename price columns to BarData fields
+        df = df.rename({
+            "open": "open_price",
+            "high": "high_price",
+            "low": "low_price",
+            "close": "close_price"
+        })
 
         symbol, exchange = extract_vt_symbol(vt_symbol)
 
-        for row in df.iter_rows(named=True):
-            bar = BarData(
-                symbol=symbol,
-                exchange=exchange,
-                datetime=row["datetime"],
-                interval=interval,
-                open_price=row["open"],
-                high_price=row["high"],
-                low_price=row["low"],
-                close_price=row["close"],
-                volume=row["volume"],
-                turnover=row["turnover"],
-                open_interest=row["open_interest"],
-                gateway_name="DB"
-            )
-            bars.append(bar)
-
-        return bars
+        return BarBatch.from_polars(df, symbol, exchange, interval)
 
     def load_bar_df(
         self,
@@ -1,8 +1,17 @@
-from .engine import Event, EventEngine, EVENT_TIMER
+from .engine import Event, EventEngine, EVENT_TIMER, EVENT_PROFILE, EVENT_QUEUE_WARNING
+from .lane import BaseQueue, BoundPolicy, LaneQueue, LockFreeQueue
+from .async_engine import AsyncEventEngine
 
 
 __all__ = [
     "Event",
     "EventEngine",
+    "AsyncEventEngine",
     "EVENT_TIMER",
+    "EVENT_PROFILE",
+    "EVENT_QUEUE_WARNING",
+    "BoundPolicy",
+    "BaseQueue",
+    "LaneQueue",
+    "LockFreeQueue",
 ]
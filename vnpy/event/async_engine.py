@@ -0,0 +1,271 @@
+"""
+Asyncio based event engine of VeighNa framework.
+"""
+
+import asyncio
+from collections import defaultdict
+from collections.abc import Awaitable, Callable
+from threading import Thread, get_ident
+
+from .engine import Event, EVENT_TIMER
+
+
+# Defines handler function to be used in async event engine, which can be
+# either normal function or coroutine function.
+AsyncHandlerType = Callable[[Event], Awaitable[None] | None]
+
+
+class AsyncEventEngine:
+    """
+    Event engine with the same register/put interface as EventEngine,
+    but distributes events on an asyncio event loop, so that coroutine
+    handlers can be awaited directly without thread switching.
+
+    Events can be put from any thread, and those put from threads other
+    than the loop thread are transferred thread-safely.
+    """
+
+    def __init__(self, interval: float = 1) -> None:
+        """
+        Timer event is generated every 1 second by default, if
+        interval not specified.
+        """
+        self._interval: float = interval
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._active: bool = False
+
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread_id: int = 0
+        self._thread: Thread | None = None
+        self._tasks: list[asyncio.Task] = []
+
+        self._timers: dict[str, float] = {EVENT_TIMER: interval}
+        self._timer_tasks: dict[str, asyncio.Task] = {}
+
+        self._handlers: defaultdict = defaultdict(list)
+        self._general_handlers: list = []
+
+    async def _run(self) -> None:
+        """
+        Get event from queue and then process it.
+        """
+        while self._active:
+            event: Event = await self._queue.get()
+
+            try:
+                await self._process(event)
+            except Exception as e:
+                self._loop.call_exception_handler({     # type: ignore
+                    "message": f"Exception in handler of event {event.type}",
+                    "exception": e,
+                })
+
+    async def _process(self, event: Event) -> None:
+        """
+        First distribute event to those handlers registered listening
+        to this type.
+
+        Then distribute event to those general handlers which listens
+        to all types.
+
+        Coroutine returned by handler is awaited before the next handler
+        is called, so that events are processed in order.
+        """
+        if event.type in self._handlers:
+            for handler in list(self._handlers[event.type]):
+                result: Awaitable[None] | None = handler(event)
+                if result is not None:
+                    await result
+
+        if self._general_handlers:
+            for handler in list(self._general_handlers):
+                result = handler(event)
+                if result is not None:
+                    await result
+
+    async def _run_timer(self, type: str, interval: float) -> None:
+        """
+        Sleep until next deadline and then generate a timer event.
+        """
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        deadline: float = loop.time() + interval
+
+        while self._active:
+            await asyncio.sleep(deadline - loop.time())
+            self._queue.put_nowait(Event(type))
+
+            # Skip missed periods instead of generating a burst
+            now: float = loop.time()
+            deadline += interval * (int((now - deadline) // interval) + 1)
+
+    def _run_loop(self) -> None:
+        """
+        Run owned event loop in background thread.
+        """
+        loop: asyncio.AbstractEventLoop = self._loop     # type: ignore
+        asyncio.set_event_loop(loop)
+
+        self._start_tasks()
+        loop.run_forever()
+
+        # Wait for cancelled tasks to finish before closing loop
+        tasks: set[asyncio.Task] = asyncio.all_tasks(loop)
+        loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        loop.close()
+
+    def _start_tasks(self) -> None:
+        """
+        Start dispatch and timer tasks, must be called in loop thread.
+        """
+        self._loop_thread_id = get_ident()
+        self._tasks.append(asyncio.ensure_future(self._run(), loop=self._loop))
+
+        for type, interval in self._timers.items():
+            self._start_timer(type, interval)
+
+    def _start_timer(self, type: str, interval: float) -> None:
+        """
+        Start timer task, must be called in loop thread.
+        """
+        self._stop_timer(type)
+
+        task: asyncio.Task = asyncio.ensure_future(self._run_timer(type, interval), loop=self._loop)
+        self._timer_tasks[type] = task
+
+    def _stop_timer(self, type: str) -> None:
+        """
+        Cancel timer task, must be called in loop thread.
+        """
+        task: asyncio.Task | None = self._timer_tasks.pop(type, None)
+        if task:
+            task.cancel()
+
+    def _cancel_tasks(self) -> None:
+        """
+        Cancel all running tasks, must be called in loop thread.
+        """
+        for type in list(self._timer_tasks):
+            self._stop_timer(type)
+
+        for task in self._tasks:
+            task.cancel()
+        self._tasks.clear()
+
+    def _call_in_loop(self, func: Callable, *args: object) -> None:
+        """
+        Call function in loop thread.
+        """
+        if not self._loop:
+            return
+
+        if get_ident() == self._loop_thread_id:
+            func(*args)
+        else:
+            self._loop.call_soon_threadsafe(func, *args)
+
+    def start(self, loop: asyncio.AbstractEventLoop | None = None) -> None:
+        """
+        Start event engine to process events and generate timer events.
+
+        If loop is given (e.g. the loop shared with async gateways and
+        strategies), tasks are run on it. Otherwise a new event loop is
+        created and run in a background thread.
+        """
+        if self._active:
+            return
+        self._active = True
+
+        if loop:
+            self._loop = loop
+            loop.call_soon_threadsafe(self._start_tasks)
+        else:
+            self._loop = asyncio.new_event_loop()
+            self._thread = Thread(target=self._run_loop, daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop event engine.
+        """
+        if not self._active:
+            return
+        self._active = False
+
+        loop: asyncio.AbstractEventLoop = self._loop       # type: ignore
+        self._call_in_loop(self._cancel_tasks)
+
+        if self._thread:
+            loop.call_soon_threadsafe(loop.stop)
+
+            if get_ident() != self._loop_thread_id:
+                self._thread.join()
+
+            self._thread = None
+
+    def put(self, event: Event) -> None:
+        """
+        Put an event object into event queue, which can be called from
+        any thread.
+        """
+        if self._loop and get_ident() != self._loop_thread_id:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, event)
+        else:
+            self._queue.put_nowait(event)
+
+    def add_timer(self, type: str, interval: float) -> None:
+        """
+        Add a timer which generates event of specific type every interval
+        seconds. Fractional interval is supported for sub-second timer.
+        """
+        if interval <= 0:
+            return
+
+        self._timers[type] = interval
+
+        if self._active:
+            self._call_in_loop(self._start_timer, type, interval)
+
+    def remove_timer(self, type: str) -> None:
+        """
+        Remove an existing timer.
+        """
+        self._timers.pop(type, None)
+
+        if self._active:
+            self._call_in_loop(self._stop_timer, type)
+
+    def register(self, type: str, handler: AsyncHandlerType) -> None:
+        """
+        Register a new handler function for a specific event type. Every
+        function can only be registered once for each event type.
+        """
+        handler_list: list = self._handlers[type]
+        if handler not in handler_list:
+            handler_list.append(handler)
+
+    def unregister(self, type: str, handler: AsyncHandlerType) -> None:
+        """
+        Unregister an existing handler function from event engine.
+        """
+        handler_list: list = self._handlers[type]
+
+        if handler in handler_list:
+            handler_list.remove(handler)
+
+        if not handler_list:
+            self._handlers.pop(type)
+
+    def register_general(self, handler: AsyncHandlerType) -> None:
+        """
+        Register a new handler function for all event types. Every
+        function can only be registered once for each event type.
+        """
+        if handler not in self._general_handlers:
+            self._general_handlers.append(handler)
+
+    def unregister_general(self, handler: AsyncHandlerType) -> None:
+        """
+        Unregister an existing general handler function.
+        """
+        if handler in self._general_handlers:
+            self._general_handlers.remove(handler)
@@ -4,13 +4,18 @@ Event-driven framework of VeighNa framework.
 
 from collections import defaultdict
 from collections.abc import Callable
-from queue import Empty, Queue
-from threading import Thread
-from time import sleep
+from queue import Empty
+from threading import Event as ThreadEvent, Lock, Thread, get_ident
+from time import monotonic
 from typing import Any
 
+from .lane import BaseQueue, Bound, BoundPolicy, LaneQueue
+from .profiler import EventProfiler
+
 
 EVENT_TIMER = "eTimer"
+EVENT_PROFILE = "eProfile"
+EVENT_QUEUE_WARNING = "eQueueWarning"
 
 
 class Event:
@@ -29,6 +34,20 @@ class Event:
 # Defines handler function to be used in event engine.
 HandlerType = Callable[[Event], None]
 
+# Defines batch handler function which receives a list of events.
+BatchHandlerType = Callable[[list[Event]], None]
+
+# Defines key function used for sharding events onto worker threads.
+KeyFuncType = Callable[[Event], Any]
+
+
+def get_event_key(event: Event) -> Any:
+    """
+    Default shard key of event: vt_symbol of the data object if
+    exists, otherwise the event type.
+    """
+    return getattr(event.data, "vt_symbol", event.type)
+
 
 class EventEngine:
     """
@@ -36,32 +55,135 @@ class EventEngine:
     to those handlers registered.
 
     It also generates timer event by every interval seconds,
-    which can be used for timing purpose.
+    which can be used for timing purpose. Extra timers with other
+    event types and (sub-second) intervals can be added by add_timer.
+
+    With workers larger than 1, events are sharded by the key returned
+    from key_func onto several worker threads. Events with the same key
+    are always processed by the same worker thread in order, while
+    handlers may be called concurrently from different workers, so
+    they should be thread-safe in this mode.
+
+    With priorities specified, events are put into different lanes by
+    the priority of their types (smaller value means higher priority),
+    and higher priority lanes are drained first.
+
+    With conflate_types specified, a pending event of these types will
+    be replaced by the newer one with the same type and key, so only the
+    latest data (e.g. tick of each vt_symbol) is processed when handlers
+    fall behind.
+
+    Ready events are got out of queue in batch of at most batch_size,
+    and batch handlers receive events of the same type in one call.
+    Events already got out can neither be overtaken by higher priority
+    events nor be conflated, so events are got one by one by default
+    when priority lanes or conflation are used.
+
+    Queue backend is selected by queue_class, LaneQueue is used by
+    default and LockFreeQueue can be used for lower put overhead if
+    priority lanes and conflation are not required.
     """
 
-    def __init__(self, interval: int = 1) -> None:
+    def __init__(
+        self,
+        interval: float = 1,
+        workers: int = 1,
+        key_func: KeyFuncType | None = None,
+        priorities: dict[str, int] | None = None,
+        starvation_limit: int = 100,
+        conflate_types: set[str] | None = None,
+        batch_size: int | None = None,
+        queue_class: type[BaseQueue] = LaneQueue
+    ) -> None:
         """
         Timer event is generated every 1 second by default, if
         interval not specified.
+
+        Single worker thread is used by default, and events are sharded
+        by vt_symbol of data (if exists) when workers is larger than 1.
+
+        Priority of event type is matched first by the full type string,
+        then by the type prefix before first dot (e.g. "eTick." for
+        "eTick.rb2501.SHFE"). Types not found in priorities are put into
+        the lowest priority lane. Conflate types are matched in the same
+        way, and key_func is used for generating the conflation key.
+
+        If batch_size not specified, at most 1000 events are got in each
+        batch, or only 1 event if priorities or conflation is enabled.
         """
-        self._interval: int = interval
-        self._queue: Queue = Queue()
+        self._interval: float = interval
+        self._workers: int = max(workers, 1)
+        self._key_func: KeyFuncType = key_func or get_event_key
+
+        # Map priority value and event type to lane index
+        self._priorities: list[int] = sorted(set(priorities.values())) if priorities else []
+        self._lane_map: dict[str, int] = {}
+        if priorities:
+            for event_type, priority in priorities.items():
+                self._lane_map[event_type] = self._priorities.index(priority)
+        self._default_lane: int = len(self._priorities)
+
+        # Route of event type: tuple of lane index, conflation flag and bound
+        self._conflate_types: set[str] = set(conflate_types) if conflate_types else set()
+        self._bounds: dict[str, Bound] = {}
+        self._routing: bool = bool(self._lane_map or self._conflate_types)
+        self._routes: dict[str, tuple[int, bool, Bound | None]] = {}
+        self._queue_class: type[BaseQueue] = queue_class
+
+        if self._conflate_types and not queue_class.conflation_supported:
+            raise ValueError(f"{queue_class.__name__} does not support conflation")
+
+        if self._lane_map and not queue_class.lane_supported:
+            raise ValueError(f"{queue_class.__name__} does not support priority lanes")
+
+        # Thread ids of all workers are shared by queues, so that a worker
+        # is never blocked by bound of any queue
+        self._worker_ids: set[int] = set()
+        self._queues: list[BaseQueue] = [
+            queue_class(self._default_lane + 1, starvation_limit, self._worker_ids)
+            for _ in range(self._workers)
+        ]
+        self._queue: BaseQueue = self._queues[0]
+        self._auto_batch: bool = batch_size is None
+        self._batch_size: int = 0
+        if batch_size is not None:
+            self._batch_size = batch_size
+        else:
+            self._update_batch_size()
+
         self._active: bool = False
-        self._thread: Thread = Thread(target=self._run)
+        self._threads: list[Thread] = [
+            Thread(target=self._run, args=(queue,)) for queue in self._queues
+        ]
         self._timer: Thread = Thread(target=self._run_timer)
+        self._timer_wakeup: ThreadEvent = ThreadEvent()
+        self._timer_lock: Lock = Lock()
+        self._timers: dict[str, list[float]] = {}      # type: [interval, deadline]
         self._handlers: defaultdict = defaultdict(list)
         self._general_handlers: list = []
+        self._batch_handlers: defaultdict = defaultdict(list)
+
+        self._profiler: EventProfiler | None = None
+        self._report_interval: int = 0
+        self._report_count: int = 0
 
-    def _run(self) -> None:
+    def _run(self, queue: BaseQueue) -> None:
         """
-        Get event from queue and then process it.
+        Get ready events from queue in batch and then process them.
         """
+        self._worker_ids.add(get_ident())
+
         while self._active:
             try:
-                event: Event = self._queue.get(block=True, timeout=1)
-                self._process(event)
+                events: list[Event] = queue.get_batch(1, self._batch_size)
             except Empty:
-                pass
+                continue
+
+            for event in events:
+                self._process(event)
+
+            if self._batch_handlers:
+                self._process_batch(events)
 
     def _process(self, event: Event) -> None:
         """
@@ -71,27 +193,86 @@ class EventEngine:
         Then distribute event to those general handlers which listens
         to all types.
         """
+        profiler: EventProfiler | None = self._profiler
+        if profiler and profiler.check(event):
+            self._process_profiled(event, profiler)
+            return
+
         if event.type in self._handlers:
             [handler(event) for handler in self._handlers[event.type]]
 
         if self._general_handlers:
             [handler(event) for handler in self._general_handlers]
 
+    def _process_profiled(self, event: Event, profiler: EventProfiler) -> None:
+        """
+        Distribute sampled event to handlers with execution time recorded.
+        """
+        if event.type in self._handlers:
+            for handler in self._handlers[event.type]:
+                profiler.call(event.type, handler, event)
+
+        for handler in self._general_handlers:
+            profiler.call(event.type, handler, event)
+
+    def _process_batch(self, events: list[Event]) -> None:
+        """
+        Group events by type and distribute them to those batch handlers
+        registered listening to the type.
+        """
+        batches: defaultdict = defaultdict(list)
+
+        for event in events:
+            if event.type in self._batch_handlers:
+                batches[event.type].append(event)
+
+        profiler: EventProfiler | None = self._profiler
+
+        for type, batch in batches.items():
+            if profiler:
+                for handler in self._batch_handlers[type]:
+                    profiler.call(type, handler, batch)
+            else:
+                [handler(batch) for handler in self._batch_handlers[type]]
+
     def _run_timer(self) -> None:
         """
-        Sleep by interval second(s) and then generate a timer event.
+        Wait until the nearest timer deadline based on monotonic clock
+        and then generate timer events, so there is no accumulated drift.
         """
+        self.add_timer(EVENT_TIMER, self._interval)
+
         while self._active:
-            sleep(self._interval)
-            event: Event = Event(EVENT_TIMER)
-            self.put(event)
+            self._timer_wakeup.clear()
+            now: float = monotonic()
+            wakeup_at: float = now + 1
+
+            with self._timer_lock:
+                timers: list = list(self._timers.items())
+
+            for type, timer in timers:
+                interval, deadline = timer
+
+                if now >= deadline:
+                    self.put(Event(type))
+
+                    # Skip missed periods instead of generating a burst
+                    deadline += interval * (int((now - deadline) // interval) + 1)
+                    timer[1] = deadline
+
+                wakeup_at = min(wakeup_at, deadline)
+
+            self._timer_wakeup.wait(wakeup_at - monotonic())
 
     def start(self) -> None:
         """
         Start event engine to process events and generate timer events.
         """
         self._active = True
-        self._thread.start()
+
+        for thread in self._threads:
+            thread.start()
+
         self._timer.start()
 
     def stop(self) -> None:
@@ -99,14 +280,253 @@ class EventEngine:
         Stop event engine.
         """
         self._active = False
+        self._timer_wakeup.set()
         self._timer.join()
-        self._thread.join()
+
+        for thread in self._threads:
+            thread.join()
 
     def put(self, event: Event) -> None:
         """
         Put an event object into event queue.
+
+        In sharded mode, the queue is chosen by hash of the event key.
+        """
+        if self._profiler:
+            self._profiler.stamp(event)
+
+        if not self._routing:
+            lane: int = 0
+            conflate: bool = False
+            bound: Bound | None = None
+        else:
+            route: tuple[int, bool, Bound | None] | None = self._routes.get(event.type, None)
+            if not route:
+                route = self._get_route(event.type)
+            lane, conflate, bound = route
+
+        if self._workers == 1 and not conflate and not bound:
+            self._queue.put(event, lane)
+            return
+
+        key: Any = self._key_func(event)
+
+        if self._workers == 1:
+            queue: BaseQueue = self._queue
+        else:
+            queue = self._queues[hash(key) % self._workers]
+
+        if conflate:
+            alarmed: bool = queue.put(event, lane, (event.type, key), bound)
+        else:
+            alarmed = queue.put(event, lane, None, bound)
+
+        if alarmed and bound:
+            data: dict = {"type": event.type, "depth": bound.high_water, "size": bound.size}
+            self.put(Event(EVENT_QUEUE_WARNING, data))
+
+    def _update_batch_size(self) -> None:
+        """
+        Choose default batch size by whether events can still be
+        reordered or conflated while pending in queue.
+        """
+        conflated: bool = any(
+            bound.policy is BoundPolicy.CONFLATE for bound in self._bounds.values()
+        )
+
+        if self._lane_map or self._conflate_types or conflated:
+            self._batch_size = 1
+        else:
+            self._batch_size = 1000
+
+    def _get_route(self, type: str) -> tuple[int, bool, Bound | None]:
         """
-        self._queue.put(event)
+        Get lane index, conflation flag and bound of event type, and then
+        save the result into route cache.
+        """
+        prefix: str = type[:type.find(".") + 1]
+
+        lane: int | None = self._lane_map.get(type, None)
+        if lane is None:
+            lane = self._lane_map.get(prefix, self._default_lane)
+
+        bound: Bound | None = self._bounds.get(type, None)
+        if not bound:
+            bound = self._bounds.get(prefix, None)
+
+        conflate: bool = type in self._conflate_types or prefix in self._conflate_types
+        if bound and bound.policy is BoundPolicy.CONFLATE:
+            conflate = True
+
+        route: tuple[int, bool, Bound | None] = (lane, conflate, bound)
+        self._routes[type] = route
+        return route
+
+    def set_bound(
+        self,
+        type: str,
+        size: int,
+        policy: BoundPolicy = BoundPolicy.BLOCK,
+        high_water: float = 0.8
+    ) -> None:
+        """
+        Limit number of pending events of specific type (matched in the
+        same way as priorities) in each worker queue:
+            * BLOCK: block producer thread until there is room, except
+              worker threads of event engine which are never blocked
+            * DROP_OLDEST: drop the oldest pending event
+            * DROP_NEWEST: drop the new event
+            * CONFLATE: conflate by key, and drop new event of new key
+
+        Queue warning event is put once pending events reach high water
+        ratio of the size.
+        """
+        if not self._queue_class.bound_supported:
+            raise ValueError(f"{self._queue_class.__name__} does not support bound")
+
+        self._bounds[type] = Bound(size, policy, max(int(size * high_water), 1))
+        self._routing = True
+        self._routes.clear()
+
+        if self._auto_batch:
+            self._update_batch_size()
+
+    def get_bound_counters(self) -> dict[str, dict[str, int]]:
+        """
+        Get depth, peak, dropped and blocked counters of each bounded
+        event type, summed up over all workers.
+        """
+        counters: dict[str, dict[str, int]] = {}
+
+        for queue in self._queues:
+            for type, data in queue.get_bound_counters().items():
+                if type not in counters:
+                    counters[type] = data
+                else:
+                    for k, v in data.items():
+                        counters[type][k] += v
+
+        return counters
+
+    def register_batch(self, type: str, handler: BatchHandlerType) -> None:
+        """
+        Register a new batch handler function for a specific event type,
+        which receives a list of events of the type in each processing
+        cycle. Every function can only be registered once for each event type.
+        """
+        handler_list: list = self._batch_handlers[type]
+        if handler not in handler_list:
+            handler_list.append(handler)
+
+    def unregister_batch(self, type: str, handler: BatchHandlerType) -> None:
+        """
+        Unregister an existing batch handler function from event engine.
+        """
+        handler_list: list = self._batch_handlers[type]
+
+        if handler in handler_list:
+            handler_list.remove(handler)
+
+        if not handler_list:
+            self._batch_handlers.pop(type)
+
+    def add_timer(self, type: str, interval: float) -> None:
+        """
+        Add a timer which generates event of specific type every interval
+        seconds. Fractional interval is supported for sub-second timer.
+        """
+        if interval <= 0:
+            return
+
+        with self._timer_lock:
+            self._timers[type] = [interval, monotonic() + interval]
+
+        self._timer_wakeup.set()
+
+    def remove_timer(self, type: str) -> None:
+        """
+        Remove an existing timer.
+        """
+        with self._timer_lock:
+            self._timers.pop(type, None)
+
+    def enable_profiling(self, sample_interval: int = 1, report_interval: int = 0) -> None:
+        """
+        Start recording queue wait time and handler execution time of
+        one in every sample_interval events.
+
+        If report_interval is larger than 0, profile event containing
+        the statistics snapshot is put every report_interval timer events.
+        """
+        self.disable_profiling()
+
+        self._profiler = EventProfiler(sample_interval)
+        self._report_interval = report_interval
+        self._report_count = 0
+
+        if report_interval > 0:
+            self.register(EVENT_TIMER, self._report_profile)
+
+    def disable_profiling(self) -> None:
+        """
+        Stop recording profiling statistics.
+        """
+        if not self._profiler:
+            return
+
+        self._profiler = None
+
+        if self._report_interval > 0:
+            self.unregister(EVENT_TIMER, self._report_profile)
+
+    def get_profile(self) -> dict[str, dict]:
+        """
+        Get snapshot of profiling statistics, latency values are in
+        microseconds:
+            * wait: queue wait time keyed by event type
+            * handler: execution time keyed by event type and handler qualname
+        """
+        if not self._profiler:
+            return {}
+        return self._profiler.get_snapshot()
+
+    def _report_profile(self, event: Event) -> None:
+        """
+        Put profile event periodically driven by timer event.
+        """
+        self._report_count += 1
+        if self._report_count < self._report_interval:
+            return
+        self._report_count = 0
+
+        self.put(Event(EVENT_PROFILE, self.get_profile()))
+
+    def get_queue_depths(self) -> dict[int | None, int]:
+        """
+        Get number of events waiting in each priority lane, summed up
+        over all workers. Lane of types without priority is keyed by None.
+        """
+        keys: list[int | None] = [*self._priorities, None]
+        depths: dict[int | None, int] = dict.fromkeys(keys, 0)
+
+        for queue in self._queues:
+            for key, depth in zip(keys, queue.get_depths(), strict=True):
+                depths[key] += depth
+
+        return depths
+
+    def get_conflated_counts(self) -> dict[str, int]:
+        """
+        Get number of events dropped by conflation of each event type,
+        summed up over all workers.
+        """
+        counts: defaultdict = defaultdict(int)
+
+        for queue in self._queues:
+            for type, count in queue.get_conflated_counts().items():
+                counts[type] += count
+
+        return dict(counts)
 
     def register(self, type: str, handler: HandlerType) -> None:
         """
@@ -0,0 +1,499 @@
+"""
+Queue backends used by event engine.
+"""
+
+from abc import ABC, abstractmethod
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from enum import Enum
+from queue import Empty
+from threading import Condition, Event, Lock, get_ident
+from typing import Any
+
+
+class BoundPolicy(Enum):
+    """
+    Policy when pending events of a bounded type reach the bound size.
+    """
+
+    BLOCK = "block"                 # block producer until there is room
+    DROP_OLDEST = "drop_oldest"     # drop the oldest pending event
+    DROP_NEWEST = "drop_newest"     # drop the new event
+    CONFLATE = "conflate"           # conflate by key, drop new event of new key
+
+
+@dataclass
+class Bound:
+    """
+    Bound setting of an event type.
+    """
+
+    size: int
+    policy: BoundPolicy
+    high_water: int
+
+
+class BaseQueue(ABC):
+    """
+    Abstract queue backend for event engine.
+    """
+
+    # Whether priority lanes, conflation key and bound are supported.
+    lane_supported: bool = False
+    conflation_supported: bool = False
+    bound_supported: bool = False
+
+    @abstractmethod
+    def __init__(
+        self,
+        lanes: int = 1,
+        starvation_limit: int = 100,
+        consumers: set[int] | None = None
+    ) -> None:
+        """
+        Consumers is the set of thread ids which are never blocked on put,
+        and it can be shared by several queues consumed by these threads.
+        """
+        pass
+
+    @abstractmethod
+    def put(self, item: Any, lane: int = 0, key: Any = None, bound: Bound | None = None) -> bool:
+        """
+        Put an item into queue, return True if the number of pending items
+        of bounded type just reached high water mark.
+        """
+        pass
+
+    @abstractmethod
+    def get(self, timeout: float | None = None) -> Any:
+        """
+        Get an item out, raise Empty if no item is available within timeout.
+        """
+        pass
+
+    @abstractmethod
+    def get_batch(self, timeout: float | None = None, size: int = 0) -> list:
+        """
+        Get all ready items (at most size if larger than 0) out in one
+        pass, raise Empty if no item is available within timeout.
+        """
+        pass
+
+    @abstractmethod
+    def qsize(self) -> int:
+        """
+        Get total number of items in queue.
+        """
+        pass
+
+    def get_depths(self) -> list[int]:
+        """
+        Get current number of items in each lane.
+        """
+        return [self.qsize()]
+
+    def get_peaks(self) -> list[int]:
+        """
+        Get peak number of items ever reached in each lane.
+        """
+        return []
+
+    def get_conflated_counts(self) -> dict[str, int]:
+        """
+        Get number of items dropped by conflation of each event type.
+        """
+        return {}
+
+    def get_bound_counters(self) -> dict[str, dict[str, int]]:
+        """
+        Get counters of each bounded event type.
+        """
+        return {}
+
+
+class LaneQueue(BaseQueue):
+    """
+    Queue consists of several FIFO lanes, and lane with smaller index
+    has higher priority when getting items out.
+
+    Starvation guard makes sure that a non-empty lower priority lane
+    will be served at least once after starvation_limit items of higher
+    priority lanes are got.
+
+    Item put with a conflation key replaces the pending item with the
+    same key in place, so that only the latest one is got out.
+
+    Item put with a bound is limited by the number of pending items of
+    its event type, and handled by the bound policy when exceeded.
+    Consumer threads are never blocked by the BLOCK policy, and their
+    items exceeding the bound are still put into queue.
+    """
+
+    lane_supported: bool = True
+    conflation_supported: bool = True
+    bound_supported: bool = True
+
+    def __init__(
+        self,
+        lanes: int = 1,
+        starvation_limit: int = 100,
+        consumers: set[int] | None = None
+    ) -> None:
+        """"""
+        self._lanes: list[deque] = [deque() for _ in range(max(lanes, 1))]
+        self._sizes: list[int] = [0] * len(self._lanes)
+        self._skips: list[int] = [0] * len(self._lanes)
+        self._peaks: list[int] = [0] * len(self._lanes)
+        self._starvation_limit: int = starvation_limit
+        self._size: int = 0
+
+        self._pending: dict[Any, Slot] = {}
+        self._conflated: defaultdict = defaultdict(int)
+
+        self._counters: dict[str, BoundCounter] = {}
+        self._fifos: defaultdict = defaultdict(deque)      # slots of drop-oldest types
+        self._consumers: set[int] = consumers if consumers is not None else set()
+
+        self._mutex: Lock = Lock()
+        self._not_empty: Condition = Condition(self._mutex)
+        self._not_full: Condition = Condition(self._mutex)
+
+    def put(self, item: Any, lane: int = 0, key: Any = None, bound: Bound | None = None) -> bool:
+        """
+        Put an item into specific lane. If key is given, the item will be
+        conflated with pending item of the same key.
+        """
+        with self._not_empty:
+            type: str = item.type
+
+            if key is not None and self._conflate(item, key):
+                return False
+
+            counter: BoundCounter | None = None
+            if bound:
+                counter = self._counters.get(type, None)
+                if not counter:
+                    counter = BoundCounter()
+                    self._counters[type] = counter
+
+                if counter.depth >= bound.size:
+                    if not self._make_room(type, counter, bound):
+                        return False
+
+                    # Pending item of the same key may be put by another
+                    # producer while this one is blocked
+                    if key is not None and self._conflate(item, key):
+                        return False
+
+            tracked: bool = bool(bound and bound.policy is BoundPolicy.DROP_OLDEST)
+
+            if key is not None or tracked:
+                slot: Slot = Slot(item, key, lane, tracked)
+
+                if key is not None:
+                    self._pending[key] = slot
+                if tracked:
+                    self._fifos[type].append(slot)
+
+                item = slot
+
+            self._lanes[lane].append(item)
+
+            self._sizes[lane] += 1
+            if self._sizes[lane] > self._peaks[lane]:
+                self._peaks[lane] = self._sizes[lane]
+
+            self._size += 1
+            self._not_empty.notify()
+
+            if not counter:
+                return False
+            return counter.increase(bound.high_water)      # type: ignore
+
+    def _conflate(self, item: Any, key: Any) -> bool:
+        """
+        Replace pending item of the same key, return True if conflated.
+        """
+        slot: Slot | None = self._pending.get(key, None)
+        if not slot:
+            return False
+
+        slot.item = item
+        self._conflated[item.type] += 1
+        return True
+
+    def _make_room(self, type: str, counter: "BoundCounter", bound: Bound) -> bool:
+        """
+        Handle bounded type which is full by bound policy, return True if
+        the new item can be put into queue.
+        """
+        if bound.policy is BoundPolicy.DROP_OLDEST:
+            slot: Slot = self._fifos[type].popleft()
+
+            if slot.key is not None:
+                self._pending.pop(slot.key)
+            slot.item = None
+
+            self._sizes[slot.lane] -= 1
+            self._size -= 1
+            counter.decrease()
+            counter.dropped += 1
+            return True
+        elif bound.policy is BoundPolicy.BLOCK:
+            # Never block consumer threads (of this queue or other queues
+            # sharing the set) to avoid dead lock
+            if get_ident() not in self._consumers:
+                counter.blocked += 1
+                while counter.depth >= bound.size:
+                    self._not_full.wait()
+            return True
+        else:
+            counter.dropped += 1
+            return False
+
+    def get(self, timeout: float | None = None) -> Any:
+        """
+        Get an item out by lane priority, raise Empty if no item is
+        available within timeout.
+        """
+        return self.get_batch(timeout, 1)[0]
+
+    def get_batch(self, timeout: float | None = None, size: int = 0) -> list:
+        """"""
+        with self._not_empty:
+            ident: int = get_ident()
+            if ident not in self._consumers:
+                self._consumers.add(ident)
+
+            if not self._size:
+                self._not_empty.wait(timeout)
+
+                if not self._size:
+                    raise Empty
+
+            count: int = min(self._size, size) if size > 0 else self._size
+            items: list = [self._pop() for _ in range(count)]
+
+            if self._counters:
+                self._not_full.notify_all()
+
+            return items
+
+    def _pop(self) -> Any:
+        """
+        Pop next item out, the mutex should be held by caller.
+        """
+        while True:
+            lane: int = self._choose_lane()
+            item: Any = self._lanes[lane].popleft()
+
+            if type(item) is Slot:
+                # Skip item already dropped
+                if item.item is None:
+                    continue
+
+                if item.key is not None:
+                    self._pending.pop(item.key)
+                if item.tracked:
+                    self._fifos[item.item.type].popleft()
+
+                item = item.item
+
+            self._sizes[lane] -= 1
+            self._size -= 1
+
+            if self._counters:
+                counter: BoundCounter | None = self._counters.get(item.type, None)
+                if counter:
+                    counter.decrease()
+
+            return item
+
+    def _choose_lane(self) -> int:
+        """
+        Choose lane to pop item from by priority and starvation guard.
+        """
+        if len(self._lanes) == 1:
+            return 0
+
+        chosen: int = -1
+        starved: int = -1
+
+        for i, buf in enumerate(self._lanes):
+            if not buf:
+                continue
+
+            if chosen < 0:
+                chosen = i
+            else:
+                self._skips[i] += 1
+                if starved < 0 and self._skips[i] > self._starvation_limit:
+                    starved = i
+
+        if starved >= 0:
+            chosen = starved
+
+        self._skips[chosen] = 0
+        return chosen
+
+    def qsize(self) -> int:
+        """
+        Get total number of items in all lanes.
+        """
+        return self._size
+
+    def get_depths(self) -> list[int]:
+        """
+        Get current number of items in each lane.
+        """
+        with self._mutex:
+            return list(self._sizes)
+
+    def get_peaks(self) -> list[int]:
+        """
+        Get peak number of items ever reached in each lane.
+        """
+        with self._mutex:
+            return list(self._peaks)
+
+    def get_conflated_counts(self) -> dict[str, int]:
+        """
+        Get number of items dropped by conflation of each event type.
+        """
+        with self._mutex:
+            return dict(self._conflated)
+
+    def get_bound_counters(self) -> dict[str, dict[str, int]]:
+        """
+        Get counters of each bounded event type.
+        """
+        with self._mutex:
+            return {type: counter.to_dict() for type, counter in self._counters.items()}
+
+
+class LockFreeQueue(BaseQueue):
+    """
+    FIFO queue without lock on put, tuned for the common pattern of
+    a few gateway producers and one event engine consumer.
+
+    Items are stored in a deque whose append and popleft are atomic in
+    CPython, and the consumer is waked up by an event only when it is
+    waiting for new items. Priority lanes and conflation are not supported.
+    """
+
+    def __init__(
+        self,
+        lanes: int = 1,
+        starvation_limit: int = 100,
+        consumers: set[int] | None = None
+    ) -> None:
+        """"""
+        if lanes > 1:
+            raise ValueError("LockFreeQueue does not support priority lanes")
+
+        self._buf: deque = deque()
+        self._waiting: bool = False
+        self._wakeup: Event = Event()
+
+    def put(self, item: Any, lane: int = 0, key: Any = None, bound: Bound | None = None) -> bool:
+        """"""
+        self._buf.append(item)
+
+        if self._waiting:
+            self._wakeup.set()
+
+        return False
+
+    def get(self, timeout: float | None = None) -> Any:
+        """"""
+        return self.get_batch(timeout, 1)[0]
+
+    def get_batch(self, timeout: float | None = None, size: int = 0) -> list:
+        """"""
+        buf: deque = self._buf
+
+        if not buf:
+            self._waiting = True
+            self._wakeup.clear()
+
+            # Check again after flag set to avoid missing wakeup
+            if not buf:
+                self._wakeup.wait(timeout)
+
+            self._waiting = False
+
+            if not buf:
+                raise Empty
+
+        count: int = min(len(buf), size) if size > 0 else len(buf)
+        return [buf.popleft() for _ in range(count)]
+
+    def qsize(self) -> int:
+        """"""
+        return len(self._buf)
+
+
+class Slot:
+    """
+    Holder of pending item which can be conflated or dropped.
+    """
+
+    __slots__ = ("item", "key", "lane", "tracked")
+
+    def __init__(self, item: Any, key: Any, lane: int, tracked: bool) -> None:
+        """"""
+        self.item: Any = item
+        self.key: Any = key
+        self.lane: int = lane
+        self.tracked: bool = tracked
+
+
+class BoundCounter:
+    """
+    Counters of a bounded event type.
+    """
+
+    __slots__ = ("depth", "peak", "dropped", "blocked", "alarmed", "high_water")
+
+    def __init__(self) -> None:
+        """"""
+        self.high_water: int = 0
+        self.depth: int = 0
+        self.peak: int = 0
+        self.dropped: int = 0
+        self.blocked: int = 0
+        self.alarmed: bool = False
+
+    def increase(self, high_water: int) -> bool:
+        """
+        Increase depth, return True if depth just reached high water mark.
+        """
+        self.depth += 1
+        self.high_water = high_water
+
+        if self.depth > self.peak:
+            self.peak = self.depth
+
+        if not self.alarmed and self.depth >= high_water:
+            self.alarmed = True
+            return True
+        return False
+
+    def decrease(self) -> None:
+        """
+        Decrease depth, and reset alarm after depth falls below half of
+        high water mark.
+        """
+        self.depth -= 1
+
+        if self.alarmed and self.depth * 2 < self.high_water:
+            self.alarmed = False
+
+    def to_dict(self) -> dict[str, int]:
+        """"""
+        return {
+            "depth": self.depth,
+            "peak": self.peak,
+            "dropped": self.dropped,
+            "blocked": self.blocked,
+        }
@@ -0,0 +1,141 @@
+"""
+Latency and throughput profiler used by event engine.
+"""
+
+from collections import deque
+from collections.abc import Callable
+from threading import Lock
+from time import perf_counter
+from typing import Any
+
+
+class LatencyRecord:
+    """
+    Statistics of latency samples, percentiles are calculated from the
+    latest sample_size samples.
+    """
+
+    def __init__(self, sample_size: int) -> None:
+        """"""
+        self.count: int = 0
+        self.total: float = 0
+        self.max: float = 0
+        self.samples: deque = deque(maxlen=sample_size)
+
+    def update(self, value: float) -> None:
+        """
+        Add a new latency sample in seconds.
+        """
+        self.count += 1
+        self.total += value
+        self.samples.append(value)
+
+        if value > self.max:
+            self.max = value
+
+    def to_dict(self) -> dict[str, float]:
+        """
+        Convert statistics into dict, latency values are in microseconds.
+        """
+        samples: list[float] = sorted(self.samples)
+        n: int = len(samples)
+
+        return {
+            "count": self.count,
+            "total": self.total * 1e6,
+            "mean": self.total / self.count * 1e6 if self.count else 0,
+            "p50": samples[int(n * 0.5)] * 1e6 if n else 0,
+            "p99": samples[min(int(n * 0.99), n - 1)] * 1e6 if n else 0,
+            "max": self.max * 1e6,
+        }
+
+
+class EventProfiler:
+    """
+    Records queue wait time (from put to dispatch) of each event type,
+    and execution time of each handler keyed by event type and handler
+    qualname.
+
+    Only one of every sample_interval events is measured for lowering
+    the overhead in production.
+    """
+
+    def __init__(self, sample_interval: int = 1, sample_size: int = 1000) -> None:
+        """"""
+        self.sample_interval: int = max(sample_interval, 1)
+        self.sample_size: int = sample_size
+
+        self._count: int = 0
+        self._waits: dict[str, LatencyRecord] = {}
+        self._handlers: dict[tuple[str, str], LatencyRecord] = {}
+        self._names: dict[Callable, str] = {}
+        self._lock: Lock = Lock()
+
+    def stamp(self, event: Any) -> None:
+        """
+        Mark event to be sampled with its put time.
+        """
+        self._count += 1
+        if self._count % self.sample_interval:
+            return
+
+        event.put_time = perf_counter()
+
+    def check(self, event: Any) -> float:
+        """
+        Check whether event is sampled, return put time if so.
+        """
+        put_time: float = event.__dict__.pop("put_time", 0)
+        if put_time:
+            self.update_wait(event.type, perf_counter() - put_time)
+        return put_time
+
+    def call(self, type: str, handler: Callable, arg: Any) -> None:
+        """
+        Call handler with arg and record its execution time.
+        """
+        start: float = perf_counter()
+        handler(arg)
+        cost: float = perf_counter() - start
+
+        name: str | None = self._names.get(handler, None)
+        if not name:
+            name = getattr(handler, "__qualname__", repr(handler))
+            self._names[handler] = name
+
+        with self._lock:
+            key: tuple[str, str] = (type, name)
+            record: LatencyRecord | None = self._handlers.get(key, None)
+            if not record:
+                record = LatencyRecord(self.sample_size)
+                self._handlers[key] = record
+            record.update(cost)
+
+    def update_wait(self, type: str, wait: float) -> None:
+        """
+        Record queue wait time of event type.
+        """
+        with self._lock:
+            record: LatencyRecord | None = self._waits.get(type, None)
+            if not record:
+                record = LatencyRecord(self.sample_size)
+                self._waits[type] = record
+            record.update(wait)
+
+    def get_snapshot(self) -> dict[str, dict]:
+        """
+        Get snapshot of all statistics, latency values are in microseconds.
+        """
+        with self._lock:
+            return {
+                "wait": {k: v.to_dict() for k, v in self._waits.items()},
+                "handler": {k: v.to_dict() for k, v in self._handlers.items()},
+            }
+
+    def clear(self) -> None:
+        """
+        Clear all statistics.
+        """
+        with self._lock:
+            self._waits.clear()
+            self._handlers.clear()
@@ -1,8 +1,11 @@
 from .client import RpcClient
 from .server import RpcServer
+from .shm import ShmPublisher, ShmSubscriber
 
 
 __all__ = [
     "RpcClient",
     "RpcServer",
+    "ShmPublisher",
+    "ShmSubscriber",
 ]
@@ -1,11 +1,36 @@
+import asyncio
 import threading
-from time import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError
+from itertools import count
+from struct import Struct
+from time import perf_counter, time
+from collections.abc import Callable
 from functools import lru_cache
 from typing import Any
 
 import zmq
 
-from .common import HEARTBEAT_TOPIC, HEARTBEAT_TOLERANCE
+from .common import (
+    HEARTBEAT_TOPIC,
+    HEARTBEAT_INTERVAL,
+    HEARTBEAT_TOLERANCE,
+    SERIALIZER_FUNCTION,
+    BATCH_FUNCTION,
+    SNAPSHOT_FUNCTION,
+    DELTA_FUNCTION,
+    COMPRESSOR_FUNCTION,
+    PUBLISH_META,
+    get_ipc_address,
+    check_ipc_address
+)
+from .compressor import BaseCompressor, COMPRESSORS, COMPRESS_THRESHOLD, compress, decompress
+from .metrics import RpcMetrics
+from .serializer import BaseSerializer, get_serializer, unpack
+
+
+# Correlation id of request, sent as routing frame before empty delimiter
+REQUEST_ID: Struct = Struct("<Q")
 
 
 class RemoteException(Exception):
@@ -26,16 +51,119 @@ class RemoteException(Exception):
         return str(self._value)
 
 
+class RpcBatch:
+    """
+    Collect remote calls and send them in one request when exiting the
+    context, each call returns a future which is done after exiting.
+
+    with client.batch() as batch:
+        futures = [batch.cancel_order(req) for req in reqs]
+    """
+
+    def __init__(self, client: "RpcClient", timeout: int) -> None:
+        """"""
+        self._client: RpcClient = client
+        self._timeout: int = timeout
+        self._calls: list[tuple[str, tuple, dict]] = []
+        self._futures: list[Future] = []
+
+    def __getattr__(self, name: str) -> Any:
+        """
+        Realize batched call function
+        """
+        def add(*args: Any, **kwargs: Any) -> Future:
+            return self._add(name, *args, **kwargs)
+
+        return add
+
+    def _add(self, name: str, *args: Any, **kwargs: Any) -> Future:
+        """
+        Add a remote call into batch.
+        """
+        future: Future = Future()
+        self._calls.append((name, args, kwargs))
+        self._futures.append(future)
+        return future
+
+    def _send(self) -> list:
+        """
+        Send all calls collected and set results of futures.
+        """
+        calls: list = self._calls
+        futures: list[Future] = self._futures
+        self._calls, self._futures = [], []
+
+        if not calls:
+            return []
+
+        results: list = self._client.call_many(calls, timeout=self._timeout)
+
+        for future, result in zip(futures, results, strict=True):
+            if isinstance(result, RemoteException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+        return results
+
+    def __enter__(self) -> "RpcBatch":
+        """"""
+        return self
+
+    def __exit__(self, exc_type: Any, exc_value: Any, traceback: Any) -> None:
+        """"""
+        if exc_type is None:
+            self._send()
+
+
 class RpcClient:
     """"""
 
-    def __init__(self) -> None:
-        """Constructor"""
+    def __init__(
+        self,
+        serializer: str = "pickle",
+        compression: bool = False,
+        context: zmq.Context | None = None
+    ) -> None:
+        """
+        Constructor
+
+        The serializer is negotiated with server before the first remote
+        call, and pickle is used if it is not supported by server.
+
+        If compression is True, compressor of the connection is also
+        negotiated, then requests and responses larger than threshold are
+        compressed.
+
+        Context can be shared with RpcServer in the same process for
+        using inproc transport.
+        """
+        # Serializer related
+        self._serializer_name: str = serializer
+        self._serializer: BaseSerializer = get_serializer("pickle")
+        self._negotiated: bool = serializer == "pickle" and not compression
+
+        # Compression related
+        self._compression: bool = compression
+        self._compressor: BaseCompressor | None = None
+
         # zmq port related
-        self._context: zmq.Context = zmq.Context()
+        self._context: zmq.Context = context or zmq.Context()
+
+        # Request socket (Request–reply pattern), dealer is used for
+        # sending requests without waiting for previous reply. It is only
+        # used by RpcClient thread, since zmq socket is not thread-safe
+        self._socket_req: zmq.Socket = self._context.socket(zmq.DEALER)
 
-        # Request socket (Request–reply pattern)
-        self._socket_req: zmq.Socket = self._context.socket(zmq.REQ)
+        # Requests from other threads are queued, and then RpcClient thread
+        # is waked up by pair sockets to send them
+        self._requests: deque[list[bytes]] = deque()
+        self._socket_wake: zmq.Socket = self._context.socket(zmq.PAIR)
+        self._socket_notify: zmq.Socket = self._context.socket(zmq.PAIR)
+
+        wake_address: str = f"inproc://rpc_client_wake_{id(self)}"
+        self._socket_wake.bind(wake_address)
+        self._socket_notify.connect(wake_address)
 
         # Subscribe socket (Publish–subscribe pattern)
         self._socket_sub: zmq.Socket = self._context.socket(zmq.SUB)
@@ -45,13 +173,32 @@ class RpcClient:
             socket.setsockopt(zmq.TCP_KEEPALIVE, 1)
             socket.setsockopt(zmq.TCP_KEEPALIVE_IDLE, 60)
 
+        # No limit of pipelined requests and their replies
+        self._socket_req.setsockopt(zmq.SNDHWM, 0)
+        self._socket_req.setsockopt(zmq.RCVHWM, 0)
+
         # Worker thread relate, used to process data pushed from server
         self._active: bool = False                 # RpcClient status
         self._thread: threading.Thread | None = None      # RpcClient thread
         self._lock: threading.Lock = threading.Lock()
+        self._negotiate_lock: threading.Lock = threading.Lock()
+
+        # Requests in flight: key is correlation id, value is future of reply
+        self._request_ids: count = count(1)
+        self._futures: dict[bytes, Future] = {}
+
+        # Synchronized topics related, only accessed by RpcClient thread
+        # except adding new prefix
+        self._synced_prefixes: list[str] = []
+        self._syncing: dict[str, list] = {}     # Data buffered during recovery
+        self._seqs: dict[str, int] = {}         # Last sequence number received
 
         self._last_received_ping: float = time()
 
+        # Metrics related
+        self._metrics: RpcMetrics | None = None
+        self._heartbeat_received: float = 0
+
     @lru_cache(100)  # noqa
     def __getattr__(self, name: str) -> Any:
         """
@@ -62,43 +209,248 @@ class RpcClient:
             # Get timeout value from kwargs, default value is 30 seconds
             timeout: int = kwargs.pop("timeout", 30000)
 
-            # Generate request
-            req: list = [name, args, kwargs]
-
             # Send request and wait for response
-            with self._lock:
-                self._socket_req.send_pyobj(req)
+            future: Future = self.call_future(name, *args, timeout=timeout, **kwargs)
+            return self._wait(future, timeout, [name, args, kwargs])
+
+        return dorpc
 
-                # Timeout reached without any data
-                n: int = self._socket_req.poll(timeout)
-                if not n:
-                    msg: str = f"Timeout of {timeout}ms reached for {req}"
-                    raise RemoteException(msg)
+    def call_many(self, calls: list[tuple[str, tuple, dict]], timeout: int = 30000) -> list:
+        """
+        Send multiple calls in one request and receive results in one
+        reply. Calls are executed by server in order, and the result of
+        failed call is RemoteException object instead of being raised.
+        """
+        calls = [(name, tuple(args), dict(kwargs)) for name, args, kwargs in calls]
 
-                rep = self._socket_req.recv_pyobj()
+        future: Future = self.call_future(BATCH_FUNCTION, calls, timeout=timeout)
+        reps: list = self._wait(future, timeout, [BATCH_FUNCTION, (calls,), {}])
 
-            # Return response if successed; Trigger exception if failed
+        results: list = []
+        for rep in reps:
             if rep[0]:
-                return rep[1]
+                results.append(rep[1])
             else:
-                raise RemoteException(rep[1])
+                results.append(RemoteException(rep[1]))
+        return results
 
-        return dorpc
+    def batch(self, timeout: int = 30000) -> RpcBatch:
+        """
+        Get context for collecting calls into one request.
+        """
+        return RpcBatch(self, timeout)
+
+    def call_future(self, name: str, *args: Any, **kwargs: Any) -> Future:
+        """
+        Send request without waiting, return future of the result.
+
+        Many requests can be in flight at the same time, and each reply
+        is matched to its future by correlation id.
+        """
+        timeout: int = kwargs.pop("timeout", 30000)
+
+        if not self._negotiated:
+            self._negotiate(timeout)
+
+        return self._send([name, args, kwargs])
+
+    async def call_async(self, name: str, *args: Any, **kwargs: Any) -> Any:
+        """
+        Awaitable version of remote call.
+        """
+        timeout: int = kwargs.pop("timeout", 30000)
+        future: Future = self.call_future(name, *args, timeout=timeout, **kwargs)
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout / 1000)
+        except asyncio.TimeoutError:
+            msg: str = f"Timeout of {timeout}ms reached for {[name, args, kwargs]}"
+            raise RemoteException(msg) from None
+
+    def _send(self, req: list, callback: Callable[[Future], None] | None = None) -> Future:
+        """
+        Send request with a new correlation id. Callback added before
+        sending is called in RpcClient thread when reply received.
+        """
+        req_id: bytes = REQUEST_ID.pack(next(self._request_ids))
+
+        future: Future = Future()
+        future.add_done_callback(lambda f: self._futures.pop(req_id, None))
+        if callback:
+            future.add_done_callback(callback)
+        self._futures[req_id] = future
+
+        # Record round trip time
+        metrics: RpcMetrics | None = self._metrics
+        if metrics:
+            name: str = req[0]
+            start: float = perf_counter()
+
+            def update_call(f: Future) -> None:
+                if not f.cancelled():
+                    metrics.update_call(name, perf_counter() - start)
+
+            future.add_done_callback(update_call)
+
+        data: bytes = compress(self._serializer.pack(req), self._compressor, COMPRESS_THRESHOLD)
+        frames: list[bytes] = [req_id, b"", data]
+
+        if threading.current_thread() is self._thread:
+            self._flush_requests()
+            self._socket_req.send_multipart(frames)
+            return future
+
+        self._requests.append(frames)
+
+        # Wake up RpcClient thread, a pending wakeup is enough if full
+        with self._lock:
+            if self._socket_notify.closed:
+                if future.set_running_or_notify_cancel():
+                    future.set_exception(RemoteException("RpcClient stopped"))
+                return future
+
+            try:
+                self._socket_notify.send(b"", zmq.NOBLOCK)
+            except zmq.Again:
+                pass
+
+        return future
+
+    def _flush_requests(self) -> None:
+        """
+        Send requests queued by other threads, only called in RpcClient thread.
+        """
+        while self._socket_wake.poll(0):
+            self._socket_wake.recv()
+
+        while self._requests:
+            self._socket_req.send_multipart(self._requests.popleft())
+
+    def _wait(self, future: Future, timeout: int, req: list) -> Any:
+        """
+        Wait for result of future.
+
+        When called from RpcClient thread (e.g. inside callback), replies
+        are received inline since the thread cannot process them otherwise.
+        """
+        try:
+            if threading.current_thread() is self._thread:
+                self._poll_reply(future, timeout)
+                return future.result(0)
+            return future.result(timeout / 1000)
+        except TimeoutError:
+            future.cancel()
+            msg: str = f"Timeout of {timeout}ms reached for {req}"
+            raise RemoteException(msg) from None
+
+    def _poll_reply(self, future: Future, timeout: int) -> None:
+        """
+        Receive replies in current thread until future done or timeout.
+        """
+        deadline: float = perf_counter() + timeout / 1000
+
+        while not future.done():
+            remaining: int = int((deadline - perf_counter()) * 1000)
+            if remaining <= 0:
+                return
+
+            if self._socket_req.poll(remaining):
+                self._process_reply()
+
+    def _negotiate(self, timeout: int) -> None:
+        """
+        Query serializers supported by server with pickle, and then use
+        the specified one if supported. Compressor is negotiated in the
+        same way if compression enabled.
+        """
+        # Reply waited by other thread holding the lock is processed by
+        # RpcClient thread, so it must not be blocked by the lock
+        if threading.current_thread() is self._thread:
+            while not self._negotiate_lock.acquire(timeout=0.01):
+                self._flush_requests()
+                self._process_reply()
+        else:
+            self._negotiate_lock.acquire()
+
+        try:
+            if self._negotiated:
+                return
+
+            serializers: list[str] = self._query([SERIALIZER_FUNCTION, (), {}], timeout) or []
+            serializer: BaseSerializer = get_serializer(self._serializer_name)
+            if serializer.fullname in serializers:
+                self._serializer = serializer
+
+            if self._compression:
+                req: list = [COMPRESSOR_FUNCTION, (list(COMPRESSORS),), {}]
+                name: str = self._query(req, timeout) or ""
+                self._compressor = COMPRESSORS.get(name, None)
+
+            self._negotiated = True
+        finally:
+            self._negotiate_lock.release()
+
+    def _query(self, req: list, timeout: int) -> Any:
+        """
+        Send negotiation request, return None if not supported by server.
+        """
+        try:
+            return self._wait(self._send(req), timeout, req)
+        except RemoteException as e:
+            # Old server without negotiation support replies with failure
+            if str(e).startswith("Timeout"):
+                raise
+            return None
+
+    def _process_reply(self) -> None:
+        """
+        Receive all replies available and set results of futures.
+        """
+        while True:
+            try:
+                frames: list[bytes] = self._socket_req.recv_multipart(flags=zmq.NOBLOCK)
+            except zmq.Again:
+                return
+
+            future: Future | None = self._futures.pop(frames[0], None)
+            if not future or not future.set_running_or_notify_cancel():
+                continue
+
+            # Set result if successed; Set exception if failed
+            _, rep = unpack(decompress(frames[-1]))
+            if rep[0]:
+                future.set_result(rep[1])
+            else:
+                future.set_exception(RemoteException(rep[1]))
 
     def start(
         self,
         req_address: str,
-        sub_address: str
+        sub_address: str,
+        ipc: bool = True
     ) -> None:
         """
         Start RpcClient
+
+        If ipc is True, ipc transport is used instead of local tcp address
+        when it is also bound and being listened by RpcServer.
         """
         if self._active:
             return
 
         # Connect zmq port
-        self._socket_req.connect(req_address)
-        self._socket_sub.connect(sub_address)
+        for socket, address in [
+            (self._socket_req, req_address),
+            (self._socket_sub, sub_address)
+        ]:
+            ipc_address: str = get_ipc_address(address) if ipc else ""
+            if ipc_address and check_ipc_address(ipc_address):
+                address = ipc_address
+
+            socket.connect(address)
+
+        # Heartbeat is always required as topics are filtered by zmq
+        self.subscribe_topic(HEARTBEAT_TOPIC)
 
         # Start RpcClient status
         self._active = True
@@ -129,26 +481,111 @@ class RpcClient:
         """
         Run RpcClient function
         """
-        pull_tolerance: int = HEARTBEAT_TOLERANCE * 1000
+        poller: zmq.Poller = zmq.Poller()
+        poller.register(self._socket_req, zmq.POLLIN)
+        poller.register(self._socket_sub, zmq.POLLIN)
+        poller.register(self._socket_wake, zmq.POLLIN)
+
+        received_at: float = time()
+        schema_warned: bool = False
 
         while self._active:
-            if not self._socket_sub.poll(pull_tolerance):
-                self.on_disconnected()
-                continue
+            events: dict = dict(poller.poll(1000))
+
+            # Send requests queued by other threads
+            if self._socket_wake in events:
+                self._flush_requests()
 
-            # Receive data from subscribe socket
-            topic, data = self._socket_sub.recv_pyobj(flags=zmq.NOBLOCK)
+            # Process replies of remote calls
+            if self._socket_req in events:
+                self._process_reply()
+
+            if self._socket_sub not in events:
+                if time() - received_at >= HEARTBEAT_TOLERANCE:
+                    self.on_disconnected()
+                    received_at = time()
+                continue
+            received_at = time()
+
+            # Receive data from subscribe socket, frames are [topic, payload, meta]
+            frames: list[bytes] = self._socket_sub.recv_multipart(flags=zmq.NOBLOCK)
+            topic: str = frames[0].decode("utf-8")
+            seq, batch = PUBLISH_META.unpack(frames[2])
+            try:
+                _, data = unpack(frames[1])
+            except ValueError as ex:
+                # Published with serializer schema of another version
+                if not schema_warned:
+                    print(f"RpcClient failed to unpack data of topic {topic}: {ex}")
+                    schema_warned = True
+                continue
 
             if topic == HEARTBEAT_TOPIC:
                 self._last_received_ping = data
+
+                if self._metrics:
+                    self._check_heartbeat_jitter()
+                continue
+
+            # Payload of batch message is data list
+            data_list: list = data if batch else [data]
+
+            if self._synced_prefixes:
+                self._process_synced(topic, seq, data_list)
             else:
                 # Process data by callable function
-                self.callback(topic, data)
+                for data in data_list:
+                    self.callback(topic, data)
 
         # Close socket
+        with self._lock:
+            self._socket_notify.close()
+        self._socket_wake.close()
         self._socket_req.close()
         self._socket_sub.close()
 
+        # Fail all requests in flight or still queued
+        self._requests.clear()
+        for future in list(self._futures.values()):
+            if future.set_running_or_notify_cancel():
+                future.set_exception(RemoteException("RpcClient stopped"))
+        self._futures.clear()
+
+    def _check_heartbeat_jitter(self) -> None:
+        """
+        Record deviation of heartbeat interval observed by client.
+        """
+        now: float = perf_counter()
+
+        if self._heartbeat_received:
+            interval: float = now - self._heartbeat_received
+            self._metrics.update_heartbeat(interval - HEARTBEAT_INTERVAL)     # type: ignore
+
+        self._heartbeat_received = now
+
+    def enable_metrics(self) -> None:
+        """
+        Start recording round trip time of remote calls and heartbeat
+        jitter observed by client.
+        """
+        self._metrics = RpcMetrics()
+        self._heartbeat_received = 0
+
+    def disable_metrics(self) -> None:
+        """
+        Stop recording metrics.
+        """
+        self._metrics = None
+
+    def get_metrics(self) -> dict[str, dict]:
+        """
+        Get snapshot of client metrics, latency values are in microseconds.
+        Metrics of server can be queried by calling _get_metrics remotely.
+        """
+        if not self._metrics:
+            return {}
+        return self._metrics.get_snapshot()
+
     def callback(self, topic: str, data: Any) -> None:
         """
         Callable function
@@ -161,6 +598,114 @@ class RpcClient:
         """
         self._socket_sub.setsockopt_string(zmq.SUBSCRIBE, topic)
 
+    def sync_topic(self, prefix: str, timeout: int = 30000) -> None:
+        """
+        Subscribe data with snapshot-then-stream handshake: last values of
+        topics matching prefix are received first from server cache, then
+        the data streamed. Sequence gaps of these topics are recovered by
+        requesting missing deltas from server.
+        """
+        if not self._negotiated:
+            self._negotiate(timeout)
+
+        # Buffer streamed data until snapshot received, which must be
+        # registered before subscribing so that no data bypasses it
+        self._syncing[prefix] = []
+        if prefix not in self._synced_prefixes:
+            self._synced_prefixes.append(prefix)
+
+        self.subscribe_topic(prefix)
+
+        self._send(
+            [SNAPSHOT_FUNCTION, (prefix,), {}],
+            lambda f: self._on_snapshot(prefix, f)
+        )
+
+    def _process_synced(self, topic: str, seq: int, data_list: list) -> None:
+        """
+        Process data with sequence check when synchronized topics exist.
+        """
+        # Buffer data during snapshot or delta recovery
+        for prefix, buffer in list(self._syncing.items()):
+            if topic.startswith(prefix):
+                buffer.append((topic, seq, data_list))
+                return
+
+        last_seq: int | None = self._seqs.get(topic, None)
+
+        if last_seq is None:
+            # Not synchronized topic
+            for prefix in self._synced_prefixes:
+                if topic.startswith(prefix):
+                    break
+            else:
+                for data in data_list:
+                    self.callback(topic, data)
+                return
+        else:
+            # Skip data received already
+            if seq + len(data_list) - 1 <= last_seq:
+                return
+
+            # Request missing deltas and buffer data until received
+            if seq > last_seq + 1:
+                self._syncing[topic] = [(topic, seq, data_list)]
+                self._send(
+                    [DELTA_FUNCTION, (topic, last_seq), {}],
+                    lambda f: self._on_deltas(topic, f)
+                )
+                return
+
+            data_list = data_list[last_seq + 1 - seq:]
+            seq = last_seq + 1
+
+        self._seqs[topic] = seq + len(data_list) - 1
+        for data in data_list:
+            self.callback(topic, data)
+
+    def _on_snapshot(self, prefix: str, future: Future) -> None:
+        """
+        Process snapshot and then data buffered during handshake.
+        """
+        buffer: list = self._syncing.pop(prefix, [])
+
+        if not future.cancelled() and not future.exception():
+            for topic, seq, data in future.result():
+                last_seq: int = self._seqs.get(topic, 0)
+                if seq > last_seq:
+                    self._seqs[topic] = seq
+                    self.callback(topic, data)
+
+        for topic, seq, data_list in buffer:
+            self._process_synced(topic, seq, data_list)
+
+    def _on_deltas(self, topic: str, future: Future) -> None:
+        """
+        Process missing deltas and then data buffered during recovery.
+        """
+        buffer: list = self._syncing.pop(topic, [])
+
+        deltas: list | None = None
+        if not future.cancelled() and not future.exception():
+            deltas = future.result()
+
+        if deltas is None:
+            # Deltas not available anymore, continue from buffered data
+            self._seqs.pop(topic, None)
+            self.on_gap(topic)
+        else:
+            for seq, data in deltas:
+                self._process_synced(topic, seq, [data])
+
+        for msg in buffer:
+            self._process_synced(*msg)
+
+    def on_gap(self, topic: str) -> None:
+        """
+        Callback when missing data of topic cannot be recovered.
+        """
+        pass
+
     def on_disconnected(self) -> None:
         """
         Callback when heartbeat is lost.
@@ -0,0 +1,231 @@
+"""
+Compact fixed-layout binary codec for market data objects.
+"""
+
+import pickle
+from datetime import datetime, timedelta
+from functools import cache
+from struct import Struct
+from typing import Any
+from zoneinfo import ZoneInfo
+
+from vnpy.trader.constant import Exchange, Interval
+from vnpy.trader.object import BarData, TickData
+
+
+# Codec id of encoded payload
+CODEC_PICKLE = 0
+CODEC_TICK = 1
+CODEC_BAR = 2
+
+EPOCH: datetime = datetime(1970, 1, 1)
+NULL_TIME: int = -(2 ** 63)
+
+EXCHANGES: list[Exchange] = list(Exchange)
+EXCHANGE_INDEX: dict[Exchange, int] = {e: i for i, e in enumerate(EXCHANGES)}
+
+INTERVALS: list[Interval] = list(Interval)
+INTERVAL_INDEX: dict[Interval, int] = {e: i for i, e in enumerate(INTERVALS)}
+NULL_INTERVAL: int = 255
+
+TICK_FLOATS: list[str] = [
+    "volume", "turnover", "open_interest", "last_price", "last_volume",
+    "limit_up", "limit_down", "open_price", "high_price", "low_price", "pre_close",
+    "bid_price_1", "bid_price_2", "bid_price_3", "bid_price_4", "bid_price_5",
+    "ask_price_1", "ask_price_2", "ask_price_3", "ask_price_4", "ask_price_5",
+    "bid_volume_1", "bid_volume_2", "bid_volume_3", "bid_volume_4", "bid_volume_5",
+    "ask_volume_1", "ask_volume_2", "ask_volume_3", "ask_volume_4", "ask_volume_5",
+]
+BAR_FLOATS: list[str] = [
+    "volume", "turnover", "open_interest",
+    "open_price", "high_price", "low_price", "close_price",
+]
+
+# Numeric part: exchange, datetime, localtime/interval, floats
+TICK_STRUCT: Struct = Struct(f"<Hqq{len(TICK_FLOATS)}d")
+BAR_STRUCT: Struct = Struct(f"<HqB{len(BAR_FLOATS)}d")
+STR_LEN: Struct = Struct("<H")
+
+
+def encode_datetime(dt: datetime | None) -> tuple[int, str] | None:
+    """
+    Convert datetime into nanoseconds of wall time since epoch and key of
+    timezone. Return None if timezone is not ZoneInfo.
+    """
+    if dt is None:
+        return NULL_TIME, ""
+
+    tz: str = ""
+    if dt.tzinfo:
+        if not isinstance(dt.tzinfo, ZoneInfo):
+            return None
+        tz = dt.tzinfo.key
+        dt = dt.replace(tzinfo=None)
+
+    delta: timedelta = dt - EPOCH
+    ns: int = (delta.days * 86400 + delta.seconds) * 1_000_000_000 + delta.microseconds * 1000
+    return ns, tz
+
+
+def decode_datetime(ns: int, tz: str) -> datetime:
+    """
+    Convert nanoseconds of wall time since epoch and timezone key into datetime.
+    """
+    dt: datetime = EPOCH + timedelta(microseconds=ns // 1000)
+    if tz:
+        dt = dt.replace(tzinfo=get_zone(tz))
+    return dt
+
+
+@cache
+def get_zone(key: str) -> ZoneInfo:
+    """
+    Get cached ZoneInfo object.
+    """
+    return ZoneInfo(key)
+
+
+def pack_strs(*strs: str) -> bytes:
+    """
+    Pack strings with length prefix.
+    """
+    buf: list[bytes] = []
+    for s in strs:
+        b: bytes = s.encode("utf-8")
+        buf.append(STR_LEN.pack(len(b)))
+        buf.append(b)
+    return b"".join(buf)
+
+
+def unpack_strs(data: bytes | memoryview, offset: int, count: int) -> list[str]:
+    """
+    Unpack strings with length prefix from offset.
+    """
+    strs: list[str] = []
+    for _ in range(count):
+        n: int = STR_LEN.unpack_from(data, offset)[0]
+        offset += 2
+        strs.append(bytes(data[offset:offset + n]).decode("utf-8"))
+        offset += n
+    return strs
+
+
+def pack_tick(tick: TickData) -> bytes | None:
+    """
+    Pack tick data into fixed layout, return None if not supported.
+    """
+    if tick.extra is not None:
+        return None
+
+    if tick.datetime is None:
+        return None
+
+    dt: tuple[int, str] | None = encode_datetime(tick.datetime)
+    localtime: tuple[int, str] | None = encode_datetime(tick.localtime)
+    if not dt or not localtime:
+        return None
+
+    head: bytes = TICK_STRUCT.pack(
+        EXCHANGE_INDEX[tick.exchange],
+        dt[0],
+        localtime[0],
+        *[getattr(tick, name) for name in TICK_FLOATS]
+    )
+    return head + pack_strs(tick.gateway_name, tick.symbol, tick.name, dt[1], localtime[1])
+
+
+def unpack_tick(data: bytes | memoryview) -> TickData:
+    """
+    Unpack tick data from fixed layout.
+    """
+    values: tuple = TICK_STRUCT.unpack_from(data)
+    gateway_name, symbol, name, tz, local_tz = unpack_strs(data, TICK_STRUCT.size, 5)
+
+    localtime: datetime | None = None
+    if values[2] != NULL_TIME:
+        localtime = decode_datetime(values[2], local_tz)
+
+    floats: dict[str, float] = dict(zip(TICK_FLOATS, values[3:], strict=True))
+
+    return TickData(
+        gateway_name=gateway_name,
+        symbol=symbol,
+        exchange=EXCHANGES[values[0]],
+        datetime=decode_datetime(values[1], tz),
+        name=name,
+        localtime=localtime,
+        **floats
+    )
+
+
+def pack_bar(bar: BarData) -> bytes | None:
+    """
+    Pack bar data into fixed layout, return None if not supported.
+    """
+    if bar.extra is not None:
+        return None
+
+    if bar.datetime is None:
+        return None
+
+    dt: tuple[int, str] | None = encode_datetime(bar.datetime)
+    if not dt:
+        return None
+
+    head: bytes = BAR_STRUCT.pack(
+        EXCHANGE_INDEX[bar.exchange],
+        dt[0],
+        INTERVAL_INDEX[bar.interval] if bar.interval else NULL_INTERVAL,
+        *[getattr(bar, name) for name in BAR_FLOATS]
+    )
+    return head + pack_strs(bar.gateway_name, bar.symbol, dt[1])
+
+
+def unpack_bar(data: bytes | memoryview) -> BarData:
+    """
+    Unpack bar data from fixed layout.
+    """
+    values: tuple = BAR_STRUCT.unpack_from(data)
+    gateway_name, symbol, tz = unpack_strs(data, BAR_STRUCT.size, 3)
+
+    floats: dict[str, float] = dict(zip(BAR_FLOATS, values[3:], strict=True))
+
+    return BarData(
+        gateway_name=gateway_name,
+        symbol=symbol,
+        exchange=EXCHANGES[values[0]],
+        datetime=decode_datetime(values[1], tz),
+        interval=INTERVALS[values[2]] if values[2] != NULL_INTERVAL else None,
+        **floats
+    )
+
+
+def encode_data(data: Any) -> tuple[int, bytes]:
+    """
+    Encode data object, fixed layout is used for tick and bar data,
+    and pickle is used for others.
+    """
+    payload: bytes | None = None
+
+    if type(data) is TickData:
+        payload = pack_tick(data)
+        if payload is not None:
+            return CODEC_TICK, payload
+    elif type(data) is BarData:
+        payload = pack_bar(data)
+        if payload is not None:
+            return CODEC_BAR, payload
+
+    return CODEC_PICKLE, pickle.dumps(data, pickle.HIGHEST_PROTOCOL)
+
+
+def decode_data(codec: int, payload: bytes | memoryview) -> Any:
+    """
+    Decode data object by codec id.
+    """
+    if codec == CODEC_TICK:
+        return unpack_tick(payload)
+    elif codec == CODEC_BAR:
+        return unpack_bar(payload)
+    else:
+        return pickle.loads(payload)
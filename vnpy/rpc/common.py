@@ -1,4 +1,10 @@
 import signal
+import socket
+from pathlib import Path
+from struct import Struct
+from tempfile import gettempdir
+
+import zmq
 
 
 # Achieve Ctrl-c interrupt recv
@@ -8,3 +14,71 @@ signal.signal(signal.SIGINT, signal.SIG_DFL)
 HEARTBEAT_TOPIC = "heartbeat"
 HEARTBEAT_INTERVAL = 10
 HEARTBEAT_TOLERANCE = 30
+
+
+# Reserved function for negotiating serializer with server
+SERIALIZER_FUNCTION = "_get_serializers"
+
+# Reserved function for executing multiple calls in one request
+BATCH_FUNCTION = "_call_many"
+
+# Reserved function for negotiating compressor of connection
+COMPRESSOR_FUNCTION = "_set_compressor"
+
+# Reserved functions for getting last values and missing deltas of topics
+SNAPSHOT_FUNCTION = "_get_snapshot"
+DELTA_FUNCTION = "_get_deltas"
+
+# Meta frame of published message: sequence number of the first data in
+# topic, and whether the payload is a data list of batch
+PUBLISH_META = Struct("<Q?")
+
+# Reserved function and topic for querying and exporting metrics
+METRICS_FUNCTION = "_get_metrics"
+METRICS_TOPIC = "rpc_metrics"
+
+
+# Hosts of tcp address which can be served by ipc transport
+LOCAL_HOSTS = {"127.0.0.1", "localhost"}
+WILDCARD_HOSTS = {"*", "0.0.0.0"}
+
+
+def get_ipc_address(address: str, bind: bool = False) -> str:
+    """
+    Get ipc address mapped from local tcp address by port, return empty
+    string if address is not local or ipc is not supported.
+    """
+    if not address.startswith("tcp://") or not zmq.has("ipc"):
+        return ""
+
+    host, _, port = address[6:].rpartition(":")
+    if not port.isdigit():
+        return ""
+
+    if host not in LOCAL_HOSTS and not (bind and host in WILDCARD_HOSTS):
+        return ""
+
+    path: Path = Path(gettempdir()).joinpath(f"vnpy_rpc_{port}.ipc")
+    return f"ipc://{path}"
+
+
+def check_ipc_address(address: str) -> bool:
+    """
+    Check whether ipc address is being listened, so that file left by
+    crashed server or server started without ipc is not connected.
+    """
+    path: str = address[6:]
+    if not Path(path).exists():
+        return False
+
+    sock: socket.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(1)
+
+    try:
+        sock.connect(path)
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+    return True
@@ -0,0 +1,143 @@
+"""
+Compressors used by RpcServer and RpcClient for large messages.
+
+Compressed data is prefixed with one byte of compressor id, which does
+not conflict with the header of serialized data. zstd and lz4 are used
+if installed, and zlib is always available.
+"""
+
+import zlib
+from abc import ABC, abstractmethod
+
+try:
+    import zstandard
+except ModuleNotFoundError:
+    zstandard = None        # type: ignore
+
+try:
+    import lz4.frame as lz4_frame
+except ModuleNotFoundError:
+    lz4_frame = None        # type: ignore
+
+
+# Messages smaller than threshold are sent without compression
+COMPRESS_THRESHOLD: int = 64 * 1024
+
+
+class BaseCompressor(ABC):
+    """
+    Abstract compressor class.
+    """
+
+    # Name used in negotiation
+    name: str = ""
+
+    # Header byte of compressed data
+    header: bytes = b""
+
+    @abstractmethod
+    def compress(self, data: bytes) -> bytes:
+        """"""
+        pass
+
+    @abstractmethod
+    def decompress(self, data: bytes | memoryview) -> bytes:
+        """"""
+        pass
+
+
+class ZlibCompressor(BaseCompressor):
+    """"""
+
+    name: str = "zlib"
+    header: bytes = b"\x10"
+
+    def __init__(self, level: int = 1) -> None:
+        """"""
+        self.level: int = level
+
+    def compress(self, data: bytes) -> bytes:
+        """"""
+        return zlib.compress(data, self.level)
+
+    def decompress(self, data: bytes | memoryview) -> bytes:
+        """"""
+        return zlib.decompress(data)
+
+
+class ZstdCompressor(BaseCompressor):
+    """"""
+
+    name: str = "zstd"
+    header: bytes = b"\x11"
+
+    def __init__(self, level: int = 3) -> None:
+        """"""
+        self.compressor = zstandard.ZstdCompressor(level=level)    # type: ignore
+        self.decompressor = zstandard.ZstdDecompressor()            # type: ignore
+
+    def compress(self, data: bytes) -> bytes:
+        """"""
+        return self.compressor.compress(data)       # type: ignore
+
+    def decompress(self, data: bytes | memoryview) -> bytes:
+        """"""
+        return self.decompressor.decompress(data)   # type: ignore
+
+
+class Lz4Compressor(BaseCompressor):
+    """"""
+
+    name: str = "lz4"
+    header: bytes = b"\x12"
+
+    def compress(self, data: bytes) -> bytes:
+        """"""
+        return lz4_frame.compress(data)             # type: ignore
+
+    def decompress(self, data: bytes | memoryview) -> bytes:
+        """"""
+        return lz4_frame.decompress(data)           # type: ignore
+
+
+# Available compressors in order of preference
+COMPRESSORS: dict[str, BaseCompressor] = {}
+if zstandard:
+    COMPRESSORS["zstd"] = ZstdCompressor()
+if lz4_frame:
+    COMPRESSORS["lz4"] = Lz4Compressor()
+COMPRESSORS["zlib"] = ZlibCompressor()
+
+COMPRESSOR_HEADERS: dict[int, BaseCompressor] = {
+    c.header[0]: c for c in COMPRESSORS.values()
+}
+
+
+def select_compressor(names: list[str]) -> BaseCompressor | None:
+    """
+    Get the first available compressor in names.
+    """
+    for name in names:
+        compressor: BaseCompressor | None = COMPRESSORS.get(name, None)
+        if compressor:
+            return compressor
+    return None
+
+
+def compress(data: bytes, compressor: BaseCompressor | None, threshold: int) -> bytes:
+    """
+    Compress data with header if compressor given and size over threshold.
+    """
+    if not compressor or len(data) < threshold:
+        return data
+    return compressor.header + compressor.compress(data)
+
+
+def decompress(data: bytes) -> bytes:
+    """
+    Decompress data if it is compressed, otherwise return it directly.
+    """
+    compressor: BaseCompressor | None = COMPRESSOR_HEADERS.get(data[0], None)
+    if not compressor:
+        return data
+    return compressor.decompress(memoryview(data)[1:])
@@ -0,0 +1,107 @@
+"""
+Latency and throughput metrics of RpcServer and RpcClient.
+"""
+
+from threading import Lock
+from time import time
+
+from vnpy.event.profiler import LatencyRecord
+
+
+class PublishRecord:
+    """
+    Statistics of data published in one topic.
+    """
+
+    def __init__(self) -> None:
+        """"""
+        self.count: int = 0
+        self.bytes: int = 0
+
+    def update(self, count: int, size: int) -> None:
+        """
+        Add a new message with number of data and size in bytes.
+        """
+        self.count += count
+        self.bytes += size
+
+    def to_dict(self, elapsed: float) -> dict[str, float]:
+        """
+        Convert statistics into dict, rates are per second.
+        """
+        return {
+            "count": self.count,
+            "bytes": self.bytes,
+            "rate": self.count / elapsed if elapsed else 0,
+            "byte_rate": self.bytes / elapsed if elapsed else 0,
+        }
+
+
+class RpcMetrics:
+    """
+    Records execution time (server side) or round trip time (client
+    side) of each function, publish count and bytes of each topic, and
+    jitter of heartbeat interval.
+    """
+
+    def __init__(self, sample_size: int = 1000) -> None:
+        """"""
+        self.sample_size: int = sample_size
+
+        self._start: float = time()
+        self._calls: dict[str, LatencyRecord] = {}
+        self._topics: dict[str, PublishRecord] = {}
+        self._heartbeat: LatencyRecord = LatencyRecord(sample_size)
+        self._lock: Lock = Lock()
+
+    def update_call(self, name: str, cost: float) -> None:
+        """
+        Record time cost of function call in seconds.
+        """
+        with self._lock:
+            record: LatencyRecord | None = self._calls.get(name, None)
+            if not record:
+                record = LatencyRecord(self.sample_size)
+                self._calls[name] = record
+            record.update(cost)
+
+    def update_publish(self, topic: str, count: int, size: int) -> None:
+        """
+        Record message published in topic.
+        """
+        with self._lock:
+            record: PublishRecord | None = self._topics.get(topic, None)
+            if not record:
+                record = PublishRecord()
+                self._topics[topic] = record
+            record.update(count, size)
+
+    def update_heartbeat(self, jitter: float) -> None:
+        """
+        Record deviation of heartbeat interval in seconds.
+        """
+        with self._lock:
+            self._heartbeat.update(abs(jitter))
+
+    def get_snapshot(self) -> dict[str, dict]:
+        """
+        Get snapshot of all statistics, latency values are in microseconds.
+        """
+        with self._lock:
+            elapsed: float = time() - self._start
+
+            return {
+                "call": {k: v.to_dict() for k, v in self._calls.items()},
+                "publish": {k: v.to_dict(elapsed) for k, v in self._topics.items()},
+                "heartbeat": self._heartbeat.to_dict(),
+            }
+
+    def clear(self) -> None:
+        """
+        Clear all statistics.
+        """
+        with self._lock:
+            self._start = time()
+            self._calls.clear()
+            self._topics.clear()
+            self._heartbeat = LatencyRecord(self.sample_size)
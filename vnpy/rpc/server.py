@@ -1,28 +1,173 @@
+import pickle
 import threading
 import traceback
-from time import time
+from collections import deque
 from collections.abc import Callable
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from inspect import ismethod
+from pathlib import Path
+from time import perf_counter, time
+from typing import Any
 
 import zmq
 
-from .common import HEARTBEAT_TOPIC, HEARTBEAT_INTERVAL
+from vnpy.event import Event
+from vnpy.trader.object import TickData
+
+from .common import (
+    HEARTBEAT_TOPIC,
+    HEARTBEAT_INTERVAL,
+    SERIALIZER_FUNCTION,
+    BATCH_FUNCTION,
+    SNAPSHOT_FUNCTION,
+    DELTA_FUNCTION,
+    METRICS_FUNCTION,
+    METRICS_TOPIC,
+    COMPRESSOR_FUNCTION,
+    PUBLISH_META,
+    get_ipc_address
+)
+from .compressor import BaseCompressor, COMPRESS_THRESHOLD, select_compressor, compress, decompress
+from .metrics import RpcMetrics
+from .serializer import BaseSerializer, SERIALIZERS, get_serializer, unpack
+
+
+def call_function(func: Callable, args: tuple, kwargs: dict) -> list:
+    """
+    Execute function and generate response, capture exception information if it fails.
+    """
+    try:
+        r: object = func(*args, **kwargs)
+        return [True, r]
+    except Exception:  # noqa
+        return [False, traceback.format_exc()]
+
+
+def call_many(calls: list[tuple[Callable | None, str, tuple, dict]]) -> list:
+    """
+    Execute functions in order and generate response of each call.
+    """
+    reps: list = []
+
+    for func, name, args, kwargs in calls:
+        if func:
+            reps.append(call_function(func, args, kwargs))
+        else:
+            reps.append([False, f"Function {name} not found"])
+
+    return reps
 
 
 class RpcServer:
     """"""
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        serializer: str = "pickle",
+        workers: int = 0,
+        process: bool = False,
+        batch_interval: int = 0,
+        batch_size: int = 1000,
+        conflate: bool = False,
+        cache_size: int = 0,
+        compress_threshold: int = COMPRESS_THRESHOLD,
+        context: zmq.Context | None = None
+    ) -> None:
         """
         Constructor
+
+        Requests are replied by the serializer used by client, and data
+        is published by the serializer specified here.
+
+        If workers is larger than 0, functions registered as pooled are
+        executed by a pool of worker threads, while others are still
+        executed inline by RpcServer thread in order. If process is also
+        True, pooled functions which are picklable plain functions are
+        executed by a pool of worker processes instead, and bound methods
+        (e.g. of engine objects) are still executed by worker threads.
+
+        If batch_interval (microseconds) is larger than 0, published data
+        is sent by a publisher thread in batches every batch_interval or
+        after batch_size messages. If conflate is also True, tick data
+        pending in batch is replaced by the latest one of same vt_symbol.
+
+        Every published data is numbered by sequence of its topic. If
+        cache_size is larger than 0, the last cache_size data of each
+        topic is kept for serving snapshot and missing deltas to clients.
+
+        Responses larger than compress_threshold bytes are compressed for
+        clients which negotiated compression on their connection.
+
+        Context can be shared with RpcClient in the same process for
+        using inproc transport.
         """
         # Save functions dict: key is function name, value is function object
         self._functions: dict[str, Callable] = {}
+        self._functions[SERIALIZER_FUNCTION] = self.get_serializers
+        self._functions[SNAPSHOT_FUNCTION] = self.get_snapshot
+        self._functions[DELTA_FUNCTION] = self.get_deltas
+        self._functions[METRICS_FUNCTION] = self.get_metrics
+
+        # Names of functions executed in worker pool, and those can be
+        # executed in worker process
+        self._pooled: set[str] = set()
+        self._picklable: set[str] = set()
+
+        # Worker pool related
+        self._workers: int = workers
+        self._process: bool = process
+        self._executor: Executor | None = None
+        self._process_executor: Executor | None = None
+
+        # Pending requests in worker pool: key is request id, value is
+        # routing envelope, serializer, function name and start time
+        self._request_id: int = 0
+        self._pending: dict[int, tuple[list[bytes], BaseSerializer, str, float]] = {}
+        self._results: deque[tuple[int, list]] = deque()
+        self._result_lock: threading.Lock = threading.Lock()
+
+        # Serializer used for publishing
+        self._serializer: BaseSerializer = get_serializer(serializer)
+
+        # Compressor of each connection, key is routing id of client
+        self._compress_threshold: int = compress_threshold
+        self._compressors: dict[bytes, BaseCompressor] = {}
+
+        # Publish batching related
+        self._batch_interval: float = batch_interval / 1_000_000
+        self._batch_size: int = batch_size
+        self._conflate: bool = conflate
+        self._buffer: list[list] = []
+        self._conflated: dict[tuple[str, str], int] = {}
+        self._buffer_condition: threading.Condition = threading.Condition()
+        self._publish_thread: threading.Thread | None = None
+
+        # Sequence number and cached data of each topic
+        self._cache_size: int = cache_size
+        self._seqs: dict[str, int] = {}
+        self._cache: dict[str, deque[tuple[int, Any]]] = {}
+
+        # Metrics related
+        self._metrics: RpcMetrics | None = None
+        self._metrics_interval: int = 0
+        self._metrics_at: float = 0
 
         # Zmq port related
-        self._context: zmq.Context = zmq.Context()
+        self._context: zmq.Context = context or zmq.Context()
+
+        # Reply socket (Request–reply pattern), router is used for
+        # replying requests out of order
+        self._socket_rep: zmq.Socket = self._context.socket(zmq.ROUTER)
 
-        # Reply socket (Request–reply pattern)
-        self._socket_rep: zmq.Socket = self._context.socket(zmq.REP)
+        # Router drops replies silently when high water mark reached, so
+        # it is disabled for clients with many pipelined requests
+        self._socket_rep.setsockopt(zmq.SNDHWM, 0)
+
+        # Pair sockets for waking up RpcServer thread when pooled
+        # function finished
+        self._socket_wake: zmq.Socket = self._context.socket(zmq.PAIR)
+        self._socket_notify: zmq.Socket = self._context.socket(zmq.PAIR)
 
         # Publish socket (Publish–subscribe pattern)
         self._socket_pub: zmq.Socket = self._context.socket(zmq.PUB)
@@ -32,6 +177,9 @@ class RpcServer:
         self._thread: threading.Thread | None = None        # RpcServer thread
         self._lock: threading.Lock = threading.Lock()
 
+        # Ipc addresses bound additionally for local tcp addresses
+        self._ipc_bindings: list[tuple[zmq.Socket, str]] = []
+
         # Heartbeat related
         self._heartbeat_at: float | None = None
 
@@ -43,16 +191,39 @@ class RpcServer:
         self,
         rep_address: str,
         pub_address: str,
+        ipc: bool = True
     ) -> None:
         """
         Start RpcServer
+
+        If ipc is True, local tcp address is also bound to ipc transport,
+        which is selected automatically by RpcClient on the same host.
         """
         if self._active:
             return
 
         # Bind socket address
-        self._socket_rep.bind(rep_address)
-        self._socket_pub.bind(pub_address)
+        for socket, address in [
+            (self._socket_rep, rep_address),
+            (self._socket_pub, pub_address)
+        ]:
+            socket.bind(address)
+
+            ipc_address: str = get_ipc_address(address, bind=True) if ipc else ""
+            if ipc_address:
+                socket.bind(ipc_address)
+                self._ipc_bindings.append((socket, ipc_address))
+
+        wake_address: str = f"inproc://rpc_wake_{id(self)}"
+        self._socket_wake.bind(wake_address)
+        self._socket_notify.connect(wake_address)
+
+        # Create worker pool
+        if self._workers > 0:
+            self._executor = ThreadPoolExecutor(self._workers)
+
+            if self._process:
+                self._process_executor = ProcessPoolExecutor(self._workers)
 
         # Start RpcServer status
         self._active = True
@@ -61,6 +232,11 @@ class RpcServer:
         self._thread = threading.Thread(target=self.run)
         self._thread.start()
 
+        # Start publisher thread
+        if self._batch_interval > 0:
+            self._publish_thread = threading.Thread(target=self.run_publish)
+            self._publish_thread.start()
+
         # Init heartbeat publish timestamp
         self._heartbeat_at = time() + HEARTBEAT_INTERVAL
 
@@ -84,47 +260,364 @@ class RpcServer:
         """
         Run RpcServer functions
         """
+        poller: zmq.Poller = zmq.Poller()
+        poller.register(self._socket_rep, zmq.POLLIN)
+        poller.register(self._socket_wake, zmq.POLLIN)
+
         while self._active:
             # Poll response socket for 1 second
-            n: int = self._socket_rep.poll(1000)
+            events: dict = dict(poller.poll(1000))
             self.check_heartbeat()
+            self.check_metrics()
+
+            # Send responses of finished pooled functions
+            if self._socket_wake in events:
+                self.send_results()
 
-            if not n:
+            if self._socket_rep not in events:
                 continue
 
-            # Receive request data from Reply socket
-            req = self._socket_rep.recv_pyobj()
+            # Receive request data from Reply socket, frames before the last
+            # one are routing envelope which should be sent back with reply
+            frames: list[bytes] = self._socket_rep.recv_multipart()
+            envelope: list[bytes] = frames[:-1]
+            serializer, req = unpack(decompress(frames[-1]))
 
             # Get function name and parameters
             name, args, kwargs = req
 
-            # Try to get and execute callable function object; capture exception information if it fails
-            try:
-                func: Callable = self._functions[name]
-                r: object = func(*args, **kwargs)
-                rep: list = [True, r]
-            except Exception as e:  # noqa
-                rep = [False, traceback.format_exc()]
+            # Batch request is executed as one call, which is pooled if
+            # any function in it is pooled
+            func: Callable | None
+            if name == BATCH_FUNCTION:
+                calls: list = [(self._functions.get(n, None), n, a, k) for n, a, k in args[0]]
+                func, args, kwargs = call_many, (calls,), {}
+                pooled: bool = any(n in self._pooled for _, n, _, _ in calls)
+                picklable: bool = all(n in self._picklable for _, n, _, _ in calls)
+            elif name == COMPRESSOR_FUNCTION:
+                func, args = self.set_compressor, (envelope[0], *args)
+                pooled = picklable = False
+            else:
+                func = self._functions.get(name, None)
+                pooled = name in self._pooled
+                picklable = name in self._picklable
+
+            # Submit pooled function to worker pool
+            if func and self._executor and pooled:
+                executor: Executor = self._executor
+                if self._process_executor and picklable:
+                    executor = self._process_executor
+
+                self._request_id += 1
+                req_id: int = self._request_id
+                self._pending[req_id] = (envelope, serializer, name, perf_counter())
+
+                future: Future = executor.submit(call_function, func, args, kwargs)
+                future.add_done_callback(partial(self.on_pooled_finished, req_id))
+                continue
+
+            # Try to execute callable function object
+            if func:
+                start: float = perf_counter()
+                rep: list = call_function(func, args, kwargs)
+
+                if self._metrics:
+                    self._metrics.update_call(name, perf_counter() - start)
+            else:
+                rep = [False, f"Function {name} not found"]
 
             # send callable response by Reply socket
-            self._socket_rep.send_pyobj(rep)
+            self.send_response(envelope, serializer, rep)
+
+        for pool in [self._executor, self._process_executor]:
+            if pool:
+                pool.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+        self._process_executor = None
+        self._pending.clear()
+
+        # Wait for publisher thread to send remaining data
+        if self._publish_thread:
+            with self._buffer_condition:
+                self._buffer_condition.notify()
+            self._publish_thread.join()
+            self._publish_thread = None
+
+        # Unbind ipc address and remove its file
+        for socket, address in self._ipc_bindings:
+            socket.unbind(address)
+            Path(address[6:]).unlink(missing_ok=True)
+        self._ipc_bindings.clear()
 
-        # Unbind socket address
         self._socket_pub.close()
         self._socket_rep.close()
+        self._socket_wake.close()
+
+        with self._result_lock:
+            self._socket_notify.close()
+
+    def send_results(self) -> None:
+        """
+        Send responses of finished pooled functions.
+        """
+        while self._socket_wake.poll(0):
+            self._socket_wake.recv()
+
+        while self._results:
+            req_id, rep = self._results.popleft()
+            envelope, serializer, name, start = self._pending.pop(req_id)
+            self.send_response(envelope, serializer, rep)
+
+            # Time cost includes waiting in worker pool
+            if self._metrics:
+                self._metrics.update_call(name, perf_counter() - start)
+
+    def send_response(self, envelope: list[bytes], serializer: BaseSerializer, rep: list) -> None:
+        """
+        Send response with routing envelope.
+        """
+        data: bytes = serializer.pack(rep)
+
+        compressor: BaseCompressor | None = self._compressors.get(envelope[0], None)
+        if compressor:
+            data = compress(data, compressor, self._compress_threshold)
+
+        self._socket_rep.send_multipart([*envelope, data])
+
+    def set_compressor(self, identity: bytes, names: list[str]) -> str:
+        """
+        Select the first supported compressor in names for the connection,
+        return its name or empty string if none is supported.
+        """
+        compressor: BaseCompressor | None = select_compressor(names)
+
+        if compressor:
+            self._compressors[identity] = compressor
+            return compressor.name
+        else:
+            self._compressors.pop(identity, None)
+            return ""
+
+    def on_pooled_finished(self, req_id: int, future: Future) -> None:
+        """
+        Callback when pooled function finished in worker pool.
+        """
+        if future.cancelled():
+            return
+
+        try:
+            rep: list = future.result()
+        except Exception:  # noqa
+            rep = [False, traceback.format_exc()]
+
+        self._results.append((req_id, rep))
+
+        # Wake up RpcServer thread
+        with self._result_lock:
+            if not self._socket_notify.closed:
+                self._socket_notify.send(b"", zmq.NOBLOCK)
 
     def publish(self, topic: str, data: object) -> None:
         """
         Publish data
         """
+        if not self._publish_thread:
+            payload: bytes = self._serializer.pack(data)
+
+            with self._lock:
+                self.send_data(topic, [data], payload)
+            return
+
+        with self._buffer_condition:
+            key: tuple[str, str] | None = None
+            if self._conflate:
+                key = get_conflation_key(topic, data)
+
+            # Replace pending data of same key in place
+            if key:
+                index: int | None = self._conflated.get(key, None)
+                if index is not None:
+                    self._buffer[index][1] = data
+                    return
+                self._conflated[key] = len(self._buffer)
+
+            self._buffer.append([topic, data])
+
+            # Wake up publisher thread to start batch interval or send batch
+            if len(self._buffer) == 1 or len(self._buffer) >= self._batch_size:
+                self._buffer_condition.notify()
+
+    def run_publish(self) -> None:
+        """
+        Run publisher thread, which sends buffered data in batches.
+        """
+        while True:
+            with self._buffer_condition:
+                while self._active and not self._buffer:
+                    self._buffer_condition.wait(1)
+
+                # Wait until batch interval passed or batch size reached
+                deadline: float = time() + self._batch_interval
+                while self._active and len(self._buffer) < self._batch_size:
+                    remaining: float = deadline - time()
+                    if remaining <= 0:
+                        break
+                    self._buffer_condition.wait(remaining)
+
+                buffer: list[list] = self._buffer
+                self._buffer = []
+                self._conflated.clear()
+
+            if buffer:
+                self.send_batch(buffer)
+            elif not self._active:
+                break
+
+    def send_batch(self, buffer: list[list]) -> None:
+        """
+        Send buffered data, consecutive data of same topic is packed into
+        one batch message of data list.
+        """
+        msgs: list[tuple[str, list, bytes]] = []
+
+        start: int = 0
+        for i in range(1, len(buffer) + 1):
+            if i < len(buffer) and buffer[i][0] == buffer[start][0]:
+                continue
+
+            topic: str = buffer[start][0]
+            data_list: list = [item[1] for item in buffer[start:i]]
+
+            if len(data_list) == 1:
+                payload: bytes = self._serializer.pack(data_list[0])
+            else:
+                payload = self._serializer.pack(data_list)
+
+            msgs.append((topic, data_list, payload))
+            start = i
+
         with self._lock:
-            self._socket_pub.send_pyobj([topic, data])
+            for topic, data_list, payload in msgs:
+                self.send_data(topic, data_list, payload)
+
+    def send_data(self, topic: str, data_list: list, payload: bytes) -> None:
+        """
+        Number data by sequence of topic and send message of frames
+        [topic, payload, meta], must be called with lock acquired.
+        """
+        seq: int = self._seqs.get(topic, 0) + 1
+        self._seqs[topic] = seq + len(data_list) - 1
+
+        if self._cache_size and topic != HEARTBEAT_TOPIC:
+            cache: deque | None = self._cache.get(topic, None)
+            if cache is None:
+                cache = self._cache[topic] = deque(maxlen=self._cache_size)
 
-    def register(self, func: Callable) -> None:
+            for i, data in enumerate(data_list):
+                cache.append((seq + i, data))
+
+        # Topic is sent as the first frame for zmq prefix filtering
+        meta: bytes = PUBLISH_META.pack(seq, len(data_list) > 1)
+        self._socket_pub.send_multipart([topic.encode("utf-8"), payload, meta])
+
+        if self._metrics:
+            self._metrics.update_publish(topic, len(data_list), len(payload))
+
+    def get_snapshot(self, prefix: str = "") -> list[tuple[str, int, Any]]:
+        """
+        Get sequence number and last data of topics matching prefix.
+        """
+        with self._lock:
+            return [
+                (topic, *cache[-1])
+                for topic, cache in self._cache.items()
+                if topic.startswith(prefix) and cache
+            ]
+
+    def get_deltas(self, topic: str, seq: int) -> list[tuple[int, Any]] | None:
+        """
+        Get data of topic with sequence number after seq, return None if
+        some of them are already removed from cache.
+        """
+        with self._lock:
+            cache: deque | None = self._cache.get(topic, None)
+            last_seq: int = self._seqs.get(topic, 0)
+
+            if seq >= last_seq:
+                return []
+
+            deltas: list[tuple[int, Any]] = [item for item in cache or [] if item[0] > seq]
+            if not deltas or deltas[0][0] != seq + 1:
+                return None
+
+            return deltas
+
+    def register(self, func: Callable, pooled: bool = False) -> None:
         """
         Register function
+
+        Inline function (default) is executed by RpcServer thread, which
+        is suitable for fast and ordering-sensitive functions. Pooled
+        function is executed by worker pool if enabled, which is suitable
+        for slow functions like querying history data.
         """
-        self._functions[func.__name__] = func
+        name: str = func.__name__
+        self._functions[name] = func
+
+        if pooled:
+            self._pooled.add(name)
+        else:
+            self._pooled.discard(name)
+
+        if pooled and is_picklable(func):
+            self._picklable.add(name)
+        else:
+            self._picklable.discard(name)
+
+    def get_serializers(self) -> list[str]:
+        """
+        Get names of supported serializers for negotiation.
+        """
+        return [s.fullname for s in SERIALIZERS.values()]
+
+    def enable_metrics(self, export_interval: int = 0) -> None:
+        """
+        Start recording metrics, which can be queried by reserved function
+        _get_metrics remotely or get_metrics locally.
+
+        If export_interval is larger than 0, metrics snapshot is published
+        in topic rpc_metrics every export_interval seconds.
+        """
+        self._metrics = RpcMetrics()
+        self._metrics_interval = export_interval
+        self._metrics_at = time() + export_interval
+
+    def disable_metrics(self) -> None:
+        """
+        Stop recording metrics.
+        """
+        self._metrics = None
+        self._metrics_interval = 0
+
+    def get_metrics(self) -> dict[str, dict]:
+        """
+        Get snapshot of metrics, latency values are in microseconds.
+        """
+        if not self._metrics:
+            return {}
+        return self._metrics.get_snapshot()
+
+    def check_metrics(self) -> None:
+        """
+        Check whether it is required to export metrics.
+        """
+        if not self._metrics_interval:
+            return
+
+        now: float = time()
+        if now >= self._metrics_at:
+            self.publish(METRICS_TOPIC, self.get_metrics())
+            self._metrics_at = now + self._metrics_interval
 
     def check_heartbeat(self) -> None:
         """
@@ -133,8 +626,41 @@ class RpcServer:
         now: float = time()
 
         if self._heartbeat_at and now >= self._heartbeat_at:
+            if self._metrics:
+                self._metrics.update_heartbeat(now - self._heartbeat_at)
+
             # Publish heartbeat
             self.publish(HEARTBEAT_TOPIC, now)
 
             # Update timestamp of next publish
             self._heartbeat_at = now + HEARTBEAT_INTERVAL
+
+
+def is_picklable(func: Callable) -> bool:
+    """
+    Check whether function can be executed in worker process. Bound
+    methods are excluded, since their objects would be copied into the
+    process and changes made there are lost.
+    """
+    if ismethod(func):
+        return False
+
+    try:
+        pickle.dumps(func)
+    except Exception:  # noqa
+        return False
+
+    return True
+
+
+def get_conflation_key(topic: str, data: Any) -> tuple[str, str] | None:
+    """
+    Get key of tick data (or event of tick data) for conflation.
+    """
+    if isinstance(data, Event):
+        data = data.data
+
+    if isinstance(data, TickData):
+        return topic, data.vt_symbol
+
+    return None
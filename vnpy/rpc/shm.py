@@ -0,0 +1,323 @@
+"""
+Same-host event bus based on shared memory ring buffer.
+
+One publisher process writes messages into the ring, and any number of
+subscriber processes read them concurrently without copying through
+sockets. Subscribers lagging behind over the ring capacity will skip
+the overwritten messages.
+"""
+
+import os
+import sys
+import threading
+from multiprocessing.shared_memory import SharedMemory
+from struct import Struct
+from time import sleep
+from typing import Any
+
+from vnpy.event import Event
+
+from .codec import encode_data, decode_data
+
+
+MAGIC: int = 0x76_6E_70_79          # "vnpy"
+VERSION: int = 1
+
+# Ring header: magic, version, capacity, write position, reserve position
+HEADER: Struct = Struct("<IIQQQ")
+HEADER_SIZE: int = 64
+POS: Struct = Struct("<Q")
+WRITE_POS_OFFSET: int = 16
+RESERVE_POS_OFFSET: int = 24
+
+# Record header: record length (0 means wrap to start), topic length, codec id.
+# Records are aligned to 8 bytes in ring.
+RECORD: Struct = Struct("<IHH")
+
+
+class ShmPublisher:
+    """
+    Publish messages into shared memory ring.
+    """
+
+    def __init__(self, name: str, capacity: int = 64 * 1024 * 1024) -> None:
+        """
+        Constructor
+        """
+        self._name: str = name
+        self._capacity: int = capacity & ~7
+        self._shm: SharedMemory | None = None
+        self._write_pos: int = 0
+        self._lock: threading.Lock = threading.Lock()
+
+    def is_active(self) -> bool:
+        """"""
+        return self._shm is not None
+
+    def start(self) -> None:
+        """
+        Create shared memory and initialize ring header.
+        """
+        if self._shm:
+            return
+
+        size: int = HEADER_SIZE + self._capacity
+
+        try:
+            self._shm = SharedMemory(self._name, create=True, size=size)
+        except FileExistsError:
+            # Remove stale shared memory left by crashed process
+            stale: SharedMemory = SharedMemory(self._name)
+            stale.close()
+            stale.unlink()
+            self._shm = SharedMemory(self._name, create=True, size=size)
+
+        self._write_pos = 0
+        buf: memoryview = self._shm.buf     # type: ignore
+        HEADER.pack_into(buf, 0, MAGIC, VERSION, self._capacity, 0, 0)
+
+    def stop(self) -> None:
+        """
+        Close and remove shared memory.
+        """
+        if not self._shm:
+            return
+
+        with self._lock:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def publish(self, topic: str, data: Any) -> None:
+        """
+        Publish data
+        """
+        codec, payload = encode_data(data)
+        topic_bytes: bytes = topic.encode("utf-8")
+
+        length: int = RECORD.size + len(topic_bytes) + len(payload)
+        aligned: int = (length + 7) & ~7
+
+        if aligned > self._capacity:
+            raise ValueError(f"Message size {length} exceeds ring capacity {self._capacity}")
+
+        with self._lock:
+            if not self._shm:
+                return
+            buf: memoryview = self._shm.buf     # type: ignore
+
+            pos: int = self._write_pos
+            offset: int = pos % self._capacity
+
+            # Mark wrap when not enough space left at the end
+            if offset + aligned > self._capacity:
+                RECORD.pack_into(buf, HEADER_SIZE + offset, 0, 0, 0)
+                pos += self._capacity - offset
+                offset = 0
+
+            # Reserve space before writing, so that readers can detect overwriting
+            POS.pack_into(buf, RESERVE_POS_OFFSET, pos + aligned)
+
+            start: int = HEADER_SIZE + offset
+            RECORD.pack_into(buf, start, length, len(topic_bytes), codec)
+
+            start += RECORD.size
+            buf[start:start + len(topic_bytes)] = topic_bytes
+
+            start += len(topic_bytes)
+            buf[start:start + len(payload)] = payload
+
+            # Update write position after data is ready for readers
+            self._write_pos = pos + aligned
+            POS.pack_into(buf, WRITE_POS_OFFSET, self._write_pos)
+
+    def process_event(self, event: Event) -> None:
+        """
+        Publish event, which can be registered as general handler of
+        EventEngine for mirroring all events.
+        """
+        self.publish(event.type, event.data)
+
+
+class ShmSubscriber:
+    """
+    Subscribe messages from shared memory ring.
+    """
+
+    def __init__(self, name: str, poll_interval: float = 0.0001) -> None:
+        """
+        Constructor
+        """
+        self._name: str = name
+        self._poll_interval: float = poll_interval
+
+        self._shm: SharedMemory | None = None
+        self._capacity: int = 0
+        self._read_pos: int = 0
+        self._topics: list[bytes] = []
+
+        self._active: bool = False
+        self._thread: threading.Thread | None = None
+
+        # Number of messages skipped due to overrun
+        self.lost_count: int = 0
+
+    def start(self) -> None:
+        """
+        Attach shared memory and start reading from the latest position.
+        """
+        if self._active:
+            return
+
+        self._shm = attach_shm(self._name)
+
+        buf: memoryview = self._shm.buf     # type: ignore
+
+        magic, version, capacity, _, _ = HEADER.unpack_from(buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Invalid shared memory ring: {self._name}")
+
+        self._capacity = capacity
+        self._read_pos = self._get_pos(WRITE_POS_OFFSET)
+
+        self._active = True
+        self._thread = threading.Thread(target=self.run)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop ShmSubscriber
+        """
+        if not self._active:
+            return
+
+        self._active = False
+
+    def join(self) -> None:
+        # Wait for ShmSubscriber thread to exit
+        if self._thread and self._thread.is_alive():
+            self._thread.join()
+        self._thread = None
+
+    def run(self) -> None:
+        """
+        Run ShmSubscriber function
+        """
+        while self._active:
+            if not self.read():
+                sleep(self._poll_interval)
+
+        if self._shm:
+            self._shm.close()
+            self._shm = None
+
+    def read(self) -> int:
+        """
+        Read all new messages in ring, return number of records read.
+        """
+        buf: memoryview = self._shm.buf     # type: ignore
+        capacity: int = self._capacity
+        write_pos: int = self._get_pos(WRITE_POS_OFFSET)
+        count: int = 0
+
+        while self._read_pos < write_pos:
+            if write_pos - self._read_pos > capacity:
+                self._skip(write_pos)
+                break
+
+            offset: int = self._read_pos % capacity
+            start: int = HEADER_SIZE + offset
+            length, topic_length, codec = RECORD.unpack_from(buf, start)
+
+            if not length:
+                if self._get_pos(RESERVE_POS_OFFSET) - self._read_pos > capacity:
+                    self._skip(self._get_pos(WRITE_POS_OFFSET))
+                    break
+
+                self._read_pos += capacity - offset
+                continue
+
+            start += RECORD.size
+            topic_bytes: bytes = bytes(buf[start:start + topic_length])
+
+            payload: bytes | None = None
+            if self._match(topic_bytes):
+                start += topic_length
+                payload = bytes(buf[start:HEADER_SIZE + offset + length])
+
+            # Check whether record was overwritten during copying
+            reserve_pos: int = self._get_pos(RESERVE_POS_OFFSET)
+            if reserve_pos - self._read_pos > capacity:
+                self._skip(self._get_pos(WRITE_POS_OFFSET))
+                break
+
+            self._read_pos += (length + 7) & ~7
+            count += 1
+
+            if payload is not None:
+                data: Any = decode_data(codec, payload)
+                self.callback(topic_bytes.decode("utf-8"), data)
+
+        return count
+
+    def _skip(self, write_pos: int) -> None:
+        """
+        Skip to latest position after overrun.
+        """
+        self.lost_count += 1
+        self._read_pos = write_pos
+
+    def _get_pos(self, offset: int) -> int:
+        """
+        Read position in header until stable value is got.
+        """
+        buf: memoryview = self._shm.buf     # type: ignore
+
+        while True:
+            pos: int = POS.unpack_from(buf, offset)[0]
+            if pos == POS.unpack_from(buf, offset)[0]:
+                return pos
+
+    def _match(self, topic: bytes) -> bool:
+        """
+        Check whether topic matches any subscribed prefix.
+        """
+        for prefix in self._topics:
+            if topic.startswith(prefix):
+                return True
+        return False
+
+    def subscribe_topic(self, topic: str) -> None:
+        """
+        Subscribe data by topic prefix, empty string for all topics.
+        """
+        prefix: bytes = topic.encode("utf-8")
+        if prefix not in self._topics:
+            self._topics.append(prefix)
+
+    def callback(self, topic: str, data: Any) -> None:
+        """
+        Callable function
+        """
+        raise NotImplementedError
+
+
+def attach_shm(name: str) -> SharedMemory:
+    """
+    Attach existing shared memory without registering it to resource
+    tracker, otherwise it would be removed when subscriber process exits.
+
+    Shared memory is only registered to resource tracker on POSIX, and
+    the tracker cannot be started on Windows.
+    """
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name, track=False)      # type: ignore
+
+    shm: SharedMemory = SharedMemory(name)
+
+    if os.name == "posix":
+        from multiprocessing import resource_tracker
+
+        resource_tracker.unregister(shm._name, "shared_memory")     # type: ignore
+
+    return shm
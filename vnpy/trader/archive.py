@@ -0,0 +1,114 @@
+"""
+On-disk archive of finished orders and trades spilled by OmsEngine.
+"""
+
+import pickle
+import sqlite3
+from pathlib import Path
+from threading import Lock
+
+from .object import OrderData, TradeData
+
+
+CREATE_SQLS: list[str] = [
+    """
+    CREATE TABLE IF NOT EXISTS orders (
+        vt_orderid TEXT PRIMARY KEY,
+        vt_symbol TEXT NOT NULL,
+        data BLOB NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS trades (
+        vt_tradeid TEXT PRIMARY KEY,
+        vt_orderid TEXT NOT NULL,
+        vt_symbol TEXT NOT NULL,
+        data BLOB NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS trades_vt_orderid ON trades (vt_orderid)",
+]
+
+
+class OmsArchive:
+    """
+    Store order and trade data as pickled blobs in SQLite, keyed by
+    vt_orderid and vt_tradeid.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """"""
+        self.path: Path = path
+        self.lock: Lock = Lock()
+
+        # Loaded from other threads (e.g. UI) while written by event thread
+        self.connection: sqlite3.Connection = sqlite3.connect(str(path), check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+
+        for sql in CREATE_SQLS:
+            self.connection.execute(sql)
+        self.connection.commit()
+
+    def save_orders(self, orders: list[OrderData]) -> None:
+        """
+        Save order data, replacing existing rows with same vt_orderid.
+        """
+        rows: list[tuple] = [
+            (order.vt_orderid, order.vt_symbol, pickle.dumps(order, pickle.HIGHEST_PROTOCOL))
+            for order in orders
+        ]
+
+        with self.lock:
+            self.connection.executemany("INSERT OR REPLACE INTO orders VALUES (?, ?, ?)", rows)
+            self.connection.commit()
+
+    def save_trades(self, trades: list[TradeData]) -> None:
+        """
+        Save trade data, replacing existing rows with same vt_tradeid.
+        """
+        rows: list[tuple] = [
+            (trade.vt_tradeid, trade.vt_orderid, trade.vt_symbol, pickle.dumps(trade, pickle.HIGHEST_PROTOCOL))
+            for trade in trades
+        ]
+
+        with self.lock:
+            self.connection.executemany("INSERT OR REPLACE INTO trades VALUES (?, ?, ?, ?)", rows)
+            self.connection.commit()
+
+    def load_order(self, vt_orderid: str) -> OrderData | None:
+        """"""
+        rows: list[tuple] = self.query("SELECT data FROM orders WHERE vt_orderid = ?", vt_orderid)
+        return pickle.loads(rows[0][0]) if rows else None
+
+    def load_trade(self, vt_tradeid: str) -> TradeData | None:
+        """"""
+        rows: list[tuple] = self.query("SELECT data FROM trades WHERE vt_tradeid = ?", vt_tradeid)
+        return pickle.loads(rows[0][0]) if rows else None
+
+    def load_order_trades(self, vt_orderid: str) -> list[TradeData]:
+        """"""
+        rows: list[tuple] = self.query("SELECT data FROM trades WHERE vt_orderid = ? ORDER BY rowid", vt_orderid)
+        return [pickle.loads(row[0]) for row in rows]
+
+    def load_all_orders(self) -> list[OrderData]:
+        """"""
+        rows: list[tuple] = self.query("SELECT data FROM orders ORDER BY rowid")
+        return [pickle.loads(row[0]) for row in rows]
+
+    def load_all_trades(self) -> list[TradeData]:
+        """"""
+        rows: list[tuple] = self.query("SELECT data FROM trades ORDER BY rowid")
+        return [pickle.loads(row[0]) for row in rows]
+
+    def query(self, sql: str, *params: str) -> list[tuple]:
+        """
+        Execute select statement and fetch all rows.
+        """
+        with self.lock:
+            return self.connection.execute(sql, params).fetchall()
+
+    def close(self) -> None:
+        """"""
+        with self.lock:
+            self.connection.close()
@@ -313,8 +313,10 @@ class OffsetConverter:
     def __init__(self, oms_engine: "OmsEngine") -> None:
         """"""
         self.holdings: dict[str, PositionHolding] = {}
+        self.holding_array: list[PositionHolding | None] = []
 
         self.get_contract = oms_engine.get_contract
+        self.get_contract_by_id = oms_engine.get_contract_by_id
 
     def update_position(self, position: PositionData) -> None:
         """"""
@@ -336,10 +338,15 @@ class OffsetConverter:
 
     def update_order(self, order: OrderData) -> None:
         """"""
-        if not self.is_convert_required(order.vt_symbol):
+        holding: PositionHolding | None
+
+        if order.instrument_id >= 0:
+            holding = self.get_holding_by_id(order.instrument_id)
+        elif self.is_convert_required(order.vt_symbol):
+            holding = self.get_position_holding(order.vt_symbol)
+        else:
             return
 
-        holding: PositionHolding | None = self.get_position_holding(order.vt_symbol)
         if holding:
             holding.update_order(order)
 
@@ -364,6 +371,28 @@ class OffsetConverter:
 
         return holding
 
+    def get_holding_by_id(self, instrument_id: int) -> PositionHolding | None:
+        """
+        Get position holding by instrument id, return None if the
+        contract does not need offset convert.
+        """
+        if instrument_id < len(self.holding_array):
+            holding: PositionHolding | None = self.holding_array[instrument_id]
+            if holding:
+                return holding
+
+        contract: ContractData | None = self.get_contract_by_id(instrument_id)
+        if not contract or contract.net_position:
+            return None
+
+        holding = self.get_position_holding(contract.vt_symbol)
+
+        if instrument_id >= len(self.holding_array):
+            self.holding_array.extend([None] * (instrument_id + 1 - len(self.holding_array)))
+        self.holding_array[instrument_id] = holding
+
+        return holding
+
     def convert_order_request(
         self,
         req: OrderRequest,
@@ -5,7 +5,7 @@ from dataclasses import dataclass
 from importlib import import_module
 
 from .constant import Interval, Exchange
-from .object import BarData, TickData
+from .object import BarData, TickData, BarBatch
 from .setting import SETTINGS
 from .utility import ZoneInfo
 from .locale import _
@@ -82,6 +82,23 @@ class BaseDatabase(ABC):
         """
         pass
 
+    def load_bar_batch(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime
+    ) -> BarBatch | None:
+        """
+        Load bar data from database as columnar batch, database driver
+        can override it for loading columns directly.
+        """
+        bars: list[BarData] = self.load_bar_data(symbol, exchange, interval, start, end)
+        if not bars:
+            return None
+        return BarBatch.from_bars(bars)
+
     @abstractmethod
     def load_tick_data(
         self,
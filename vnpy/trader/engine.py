@@ -2,9 +2,12 @@ import smtplib
 import os
 import traceback
 from abc import ABC, abstractmethod
+from datetime import datetime
 from email.message import EmailMessage
+from pathlib import Path
 from queue import Empty, Queue
 from threading import Thread
+from time import monotonic
 from typing import TypeVar
 from collections.abc import Callable
 
@@ -18,7 +21,8 @@ from .event import (
     EVENT_ACCOUNT,
     EVENT_CONTRACT,
     EVENT_LOG,
-    EVENT_QUOTE
+    EVENT_QUOTE,
+    EVENT_TIMER
 )
 from .gateway import BaseGateway
 from .object import (
@@ -36,11 +40,13 @@ from .object import (
     PositionData,
     AccountData,
     ContractData,
-    Exchange
+    Exchange,
+    InstrumentRegistry
 )
 from .setting import SETTINGS
-from .utility import TRADER_DIR
+from .utility import TRADER_DIR, get_folder_path
 from .converter import OffsetConverter
+from .archive import OmsArchive
 from .logger import logger, DEBUG, INFO, WARNING, ERROR, CRITICAL
 from .locale import _
 
@@ -141,6 +147,9 @@ class MainEngine:
         self.get_account: Callable[[str], AccountData | None] = oms_engine.get_account
         self.get_contract: Callable[[str], ContractData | None] = oms_engine.get_contract
         self.get_quote: Callable[[str], QuoteData | None] = oms_engine.get_quote
+        self.get_instrument_id: Callable[[str], int] = oms_engine.get_instrument_id
+        self.get_tick_by_id: Callable[[int], TickData | None] = oms_engine.get_tick_by_id
+        self.get_contract_by_id: Callable[[int], ContractData | None] = oms_engine.get_contract_by_id
         self.get_all_ticks: Callable[[], list[TickData]] = oms_engine.get_all_ticks
         self.get_all_orders: Callable[[], list[OrderData]] = oms_engine.get_all_orders
         self.get_all_trades: Callable[[], list[TradeData]] = oms_engine.get_all_trades
@@ -150,6 +159,9 @@ class MainEngine:
         self.get_all_quotes: Callable[[], list[QuoteData]] = oms_engine.get_all_quotes
         self.get_all_active_orders: Callable[[], list[OrderData]] = oms_engine.get_all_active_orders
         self.get_all_active_quotes: Callable[[], list[QuoteData]] = oms_engine.get_all_active_quotes
+        self.get_active_orders: Callable[..., list[OrderData]] = oms_engine.get_active_orders
+        self.get_positions: Callable[[str], list[PositionData]] = oms_engine.get_positions
+        self.get_order_trades: Callable[[str], list[TradeData]] = oms_engine.get_order_trades
         self.update_order_request: Callable[[OrderRequest, str, str], None] = oms_engine.update_order_request
         self.convert_order_request: Callable[[OrderRequest, str, bool, bool], list[OrderRequest]] = oms_engine.convert_order_request
         self.get_converter: Callable[[str], OffsetConverter | None] = oms_engine.get_converter
@@ -342,8 +354,28 @@ class OmsEngine(BaseEngine):
         self.active_orders: dict[str, OrderData] = {}
         self.active_quotes: dict[str, QuoteData] = {}
 
+        # Secondary indexes updated incrementally when events received
+        self.symbol_active_orders: dict[str, dict[str, OrderData]] = {}
+        self.gateway_active_orders: dict[str, dict[str, OrderData]] = {}
+        self.reference_active_orders: dict[str, dict[str, OrderData]] = {}
+        self.symbol_positions: dict[str, dict[str, PositionData]] = {}
+        self.order_trades: dict[str, dict[str, TradeData]] = {}
+
         self.offset_converters: dict[str, OffsetConverter] = {}
 
+        # Dense instrument ids assigned to contracts, and data indexed by id
+        self.registry: InstrumentRegistry = InstrumentRegistry()
+        self.contract_array: list[ContractData | None] = []
+        self.tick_array: list[TickData | None] = []
+
+        # Retention of finished orders and trades, disabled by default
+        self.archive: OmsArchive | None = None
+        self.retention_active: bool = False
+        self.retention_minutes: int = 0
+        self.retention_count: int = 0
+        self.order_finish_times: dict[str, float] = {}
+        self.trade_times: dict[str, float] = {}
+
         self.register_event()
 
     def register_event(self) -> None:
@@ -361,17 +393,44 @@ class OmsEngine(BaseEngine):
         tick: TickData = event.data
         self.ticks[tick.vt_symbol] = tick
 
+        # Gateway can set id got from get_instrument_id in advance to
+        # skip the registry lookup of every tick
+        instrument_id: int = tick.instrument_id
+        if instrument_id < 0:
+            instrument_id = self.registry.ids.get(tick.vt_symbol, -1)
+            if instrument_id < 0:
+                return
+            tick.instrument_id = instrument_id
+
+        self.tick_array[instrument_id] = tick
+
     def process_order_event(self, event: Event) -> None:
         """"""
         order: OrderData = event.data
+        order.instrument_id = self.registry.ids.get(order.vt_symbol, -1)
         self.orders[order.vt_orderid] = order
 
+        # Remove index entries by keys of previous data, since later update
+        # may come with different keys (e.g. without reference)
+        old: OrderData | None = self.active_orders.pop(order.vt_orderid, None)
+        if old:
+            remove_index(self.symbol_active_orders, old.vt_symbol, old.vt_orderid)
+            remove_index(self.gateway_active_orders, old.gateway_name, old.vt_orderid)
+            remove_index(self.reference_active_orders, old.reference, old.vt_orderid)
+
         # If order is active, then update data in dict.
         if order.is_active():
             self.active_orders[order.vt_orderid] = order
-        # Otherwise, pop inactive order from in dict
-        elif order.vt_orderid in self.active_orders:
-            self.active_orders.pop(order.vt_orderid)
+
+            add_index(self.symbol_active_orders, order.vt_symbol, order.vt_orderid, order)
+            add_index(self.gateway_active_orders, order.gateway_name, order.vt_orderid, order)
+            add_index(self.reference_active_orders, order.reference, order.vt_orderid, order)
+
+        # Record finish time in order for retention check
+        if self.retention_active:
+            self.order_finish_times.pop(order.vt_orderid, None)
+            if not order.is_active():
+                self.order_finish_times[order.vt_orderid] = monotonic()
 
         # Update to offset converter
         converter: OffsetConverter | None = self.offset_converters.get(order.gateway_name, None)
@@ -383,6 +442,12 @@ class OmsEngine(BaseEngine):
         trade: TradeData = event.data
         self.trades[trade.vt_tradeid] = trade
 
+        add_index(self.order_trades, trade.vt_orderid, trade.vt_tradeid, trade)
+
+        if self.retention_active:
+            self.trade_times.pop(trade.vt_tradeid, None)
+            self.trade_times[trade.vt_tradeid] = monotonic()
+
         # Update to offset converter
         converter: OffsetConverter | None = self.offset_converters.get(trade.gateway_name, None)
         if converter:
@@ -393,6 +458,8 @@ class OmsEngine(BaseEngine):
         position: PositionData = event.data
         self.positions[position.vt_positionid] = position
 
+        add_index(self.symbol_positions, position.vt_symbol, position.vt_positionid, position)
+
         # Update to offset converter
         converter: OffsetConverter | None = self.offset_converters.get(position.gateway_name, None)
         if converter:
@@ -408,6 +475,14 @@ class OmsEngine(BaseEngine):
         contract: ContractData = event.data
         self.contracts[contract.vt_symbol] = contract
 
+        # Assign instrument id and extend arrays for new instrument
+        instrument_id: int = self.registry.register(contract.symbol, contract.exchange)
+        if instrument_id == len(self.contract_array):
+            self.contract_array.append(contract)
+            self.tick_array.append(None)
+        else:
+            self.contract_array[instrument_id] = contract
+
         # Initialize offset converter for each gateway
         if contract.gateway_name not in self.offset_converters:
             self.offset_converters[contract.gateway_name] = OffsetConverter(self)
@@ -424,6 +499,93 @@ class OmsEngine(BaseEngine):
         elif quote.vt_quoteid in self.active_quotes:
             self.active_quotes.pop(quote.vt_quoteid)
 
+    def process_timer_event(self, event: Event) -> None:
+        """"""
+        self.spill()
+
+    def enable_retention(self, minutes: int = 0, count: int = 0, path: Path | None = None) -> None:
+        """
+        Start moving orders and trades finished earlier than minutes,
+        or beyond count of the latest ones, into SQLite archive file on
+        every timer event. Zero minutes or count means no limit.
+
+        Archived data is still returned by get_order, get_trade and
+        get_order_trades, but not included in get_all_orders/get_all_trades.
+        """
+        if not minutes and not count:
+            return
+
+        self.retention_minutes = minutes
+        self.retention_count = count
+
+        if self.retention_active:
+            return
+        self.retention_active = True
+
+        self.event_engine.register(EVENT_TIMER, self.process_timer_event)
+
+        if not self.archive:
+            if not path:
+                path = get_folder_path("oms_archive").joinpath(f"{datetime.now():%Y%m%d_%H%M%S}.db")
+            self.archive = OmsArchive(path)
+
+        # Data received before enabled is regarded as finished just now
+        now: float = monotonic()
+        for order in self.orders.values():
+            if not order.is_active():
+                self.order_finish_times[order.vt_orderid] = now
+        for vt_tradeid in self.trades:
+            self.trade_times[vt_tradeid] = now
+
+    def disable_retention(self) -> None:
+        """
+        Stop moving data into archive, archived data is still available.
+        """
+        if not self.retention_active:
+            return
+
+        self.retention_active = False
+        self.retention_minutes = 0
+        self.retention_count = 0
+        self.event_engine.unregister(EVENT_TIMER, self.process_timer_event)
+
+        self.order_finish_times.clear()
+        self.trade_times.clear()
+
+    def spill(self) -> None:
+        """
+        Move finished orders and trades out of retention into archive.
+        """
+        if not self.archive or not self.retention_active:
+            return
+
+        deadline: float = 0
+        if self.retention_minutes:
+            deadline = monotonic() - self.retention_minutes * 60
+
+        # Data is saved into archive before removed from memory, so that
+        # it can always be found by other threads in between
+        vt_orderids: list[str] = pop_expired(self.order_finish_times, deadline, self.retention_count)
+        if vt_orderids:
+            self.archive.save_orders([self.orders[vt_orderid] for vt_orderid in vt_orderids])
+
+            for vt_orderid in vt_orderids:
+                self.orders.pop(vt_orderid)
+
+        vt_tradeids: list[str] = pop_expired(self.trade_times, deadline, self.retention_count)
+        if vt_tradeids:
+            trades: list[TradeData] = [self.trades[vt_tradeid] for vt_tradeid in vt_tradeids]
+            self.archive.save_trades(trades)
+
+            for trade in trades:
+                self.trades.pop(trade.vt_tradeid)
+                remove_index(self.order_trades, trade.vt_orderid, trade.vt_tradeid)
+
+    def close(self) -> None:
+        """"""
+        if self.archive:
+            self.archive.close()
+
     def get_tick(self, vt_symbol: str) -> TickData | None:
         """
         Get latest market tick data by vt_symbol.
@@ -434,13 +596,23 @@ class OmsEngine(BaseEngine):
         """
         Get latest order data by vt_orderid.
         """
-        return self.orders.get(vt_orderid, None)
+        order: OrderData | None = self.orders.get(vt_orderid, None)
+
+        if not order and self.archive:
+            order = self.archive.load_order(vt_orderid)
+
+        return order
 
     def get_trade(self, vt_tradeid: str) -> TradeData | None:
         """
         Get trade data by vt_tradeid.
         """
-        return self.trades.get(vt_tradeid, None)
+        trade: TradeData | None = self.trades.get(vt_tradeid, None)
+
+        if not trade and self.archive:
+            trade = self.archive.load_trade(vt_tradeid)
+
+        return trade
 
     def get_position(self, vt_positionid: str) -> PositionData | None:
         """
@@ -460,6 +632,28 @@ class OmsEngine(BaseEngine):
         """
         return self.contracts.get(vt_symbol, None)
 
+    def get_instrument_id(self, vt_symbol: str) -> int:
+        """
+        Get instrument id by vt_symbol, return -1 if contract not received.
+        """
+        return self.registry.get_id(vt_symbol)
+
+    def get_tick_by_id(self, instrument_id: int) -> TickData | None:
+        """
+        Get latest market tick data by instrument id.
+        """
+        if 0 <= instrument_id < len(self.tick_array):
+            return self.tick_array[instrument_id]
+        return None
+
+    def get_contract_by_id(self, instrument_id: int) -> ContractData | None:
+        """
+        Get contract data by instrument id.
+        """
+        if 0 <= instrument_id < len(self.contract_array):
+            return self.contract_array[instrument_id]
+        return None
+
     def get_quote(self, vt_quoteid: str) -> QuoteData | None:
         """
         Get latest quote data by vt_orderid.
@@ -474,13 +668,13 @@ class OmsEngine(BaseEngine):
 
     def get_all_orders(self) -> list[OrderData]:
         """
-        Get all order data.
+        Get all order data in memory.
         """
         return list(self.orders.values())
 
     def get_all_trades(self) -> list[TradeData]:
         """
-        Get all trade data.
+        Get all trade data in memory.
         """
         return list(self.trades.values())
 
@@ -520,6 +714,62 @@ class OmsEngine(BaseEngine):
         """
         return list(self.active_quotes.values())
 
+    def get_active_orders(
+        self,
+        vt_symbol: str = "",
+        gateway_name: str = "",
+        reference: str | None = None
+    ) -> list[OrderData]:
+        """
+        Get active orders filtered by vt_symbol, gateway_name and reference,
+        empty vt_symbol/gateway_name and None reference mean no filter.
+        """
+        indexes: list[dict[str, OrderData]] = []
+        filters: list[tuple[str, str]] = []
+
+        if vt_symbol:
+            indexes.append(self.symbol_active_orders.get(vt_symbol, {}))
+            filters.append(("vt_symbol", vt_symbol))
+        if gateway_name:
+            indexes.append(self.gateway_active_orders.get(gateway_name, {}))
+            filters.append(("gateway_name", gateway_name))
+        if reference is not None:
+            indexes.append(self.reference_active_orders.get(reference, {}))
+            filters.append(("reference", reference))
+
+        if not indexes:
+            return list(self.active_orders.values())
+
+        # Start from the smallest index, then check the other conditions
+        orders: dict[str, OrderData] = min(indexes, key=len)
+        if len(filters) == 1:
+            return list(orders.values())
+
+        return [
+            order for order in orders.values()
+            if all(getattr(order, name) == value for name, value in filters)
+        ]
+
+    def get_positions(self, vt_symbol: str) -> list[PositionData]:
+        """
+        Get position data of all directions and gateways by vt_symbol.
+        """
+        return list(self.symbol_positions.get(vt_symbol, {}).values())
+
+    def get_order_trades(self, vt_orderid: str) -> list[TradeData]:
+        """
+        Get all trade data of an order by vt_orderid.
+        """
+        trades: dict[str, TradeData] = self.order_trades.get(vt_orderid, {})
+
+        if self.archive:
+            archived: dict[str, TradeData] = {
+                trade.vt_tradeid: trade for trade in self.archive.load_order_trades(vt_orderid)
+            }
+            trades = archived | trades
+
+        return list(trades.values())
+
     def update_order_request(self, req: OrderRequest, vt_orderid: str, gateway_name: str) -> None:
         """
         Update order request to offset converter.
@@ -617,3 +867,46 @@ class EmailEngine(BaseEngine):
 
         self.active = False
         self.thread.join()
+
+
+def add_index(index: dict[str, dict], key: str, vt_id: str, data: object) -> None:
+    """
+    Add data into secondary index.
+    """
+    d: dict | None = index.get(key, None)
+    if d is None:
+        d = index[key] = {}
+    d[vt_id] = data
+
+
+def remove_index(index: dict[str, dict], key: str, vt_id: str) -> None:
+    """
+    Remove data from secondary index, and drop empty bucket.
+    """
+    d: dict | None = index.get(key, None)
+    if d is None:
+        return
+
+    d.pop(vt_id, None)
+    if not d:
+        index.pop(key)
+
+
+def pop_expired(times: dict[str, float], deadline: float, count: int) -> list[str]:
+    """
+    Pop ids recorded before deadline or beyond the latest count from
+    times dict, which is ordered by recorded time.
+    """
+    limit: int = len(times) - count if count else 0
+    vt_ids: list[str] = []
+
+    for vt_id, t in times.items():
+        if len(vt_ids) < limit or t < deadline:
+            vt_ids.append(vt_id)
+        else:
+            break
+
+    for vt_id in vt_ids:
+        times.pop(vt_id)
+
+    return vt_ids
@@ -2,7 +2,7 @@
 Event type string used in the trading platform.
 """
 
-from vnpy.event import EVENT_TIMER  # noqa
+from vnpy.event import EVENT_TIMER
 
 EVENT_TICK = "eTick."
 EVENT_TRADE = "eTrade."
@@ -12,3 +12,18 @@ EVENT_ACCOUNT = "eAccount."
 EVENT_QUOTE = "eQuote."
 EVENT_CONTRACT = "eContract."
 EVENT_LOG = "eLog"
+
+
+# Priority of event types for enabling priority lanes in EventEngine,
+# smaller value means higher priority.
+EVENT_PRIORITIES: dict[str, int] = {
+    EVENT_TRADE: 0,
+    EVENT_ORDER: 0,
+    EVENT_QUOTE: 0,
+    EVENT_POSITION: 1,
+    EVENT_ACCOUNT: 1,
+    EVENT_CONTRACT: 1,
+    EVENT_TICK: 2,
+    EVENT_TIMER: 3,
+    EVENT_LOG: 3,
+}
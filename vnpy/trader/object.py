@@ -2,11 +2,20 @@
 Basic data structure used for general trading function in the trading platform.
 """
 
-from dataclasses import dataclass, field
-from datetime import datetime as Datetime
+import sys
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from dataclasses import dataclass, field, fields
+from datetime import datetime as Datetime, tzinfo
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
 
 from .constant import Direction, Exchange, Interval, Offset, Status, Product, OptionType, OrderType
 
+if TYPE_CHECKING:
+    import polars as pl
+
 
 INFO: int = 20
 
@@ -14,11 +23,87 @@ INFO: int = 20
 ACTIVE_STATUSES = set([Status.SUBMITTING, Status.NOTTRADED, Status.PARTTRADED])
 
 
+# Interned vt_symbol strings keyed by (symbol, exchange)
+VT_SYMBOLS: dict[tuple[str, Exchange], str] = {}
+
+
+def get_vt_symbol(symbol: str, exchange: Exchange) -> str:
+    """
+    Get interned vt_symbol string, which is generated only once for each
+    symbol and exchange.
+    """
+    key: tuple[str, Exchange] = (symbol, exchange)
+
+    vt_symbol: str | None = VT_SYMBOLS.get(key, None)
+    if vt_symbol is None:
+        vt_symbol = sys.intern(f"{symbol}.{exchange.value}")
+        VT_SYMBOLS[key] = vt_symbol
+
+    return vt_symbol
+
+
+class InstrumentRegistry:
+    """
+    Assign dense integer id to each instrument, so that data can be
+    stored in list indexed by id instead of dict keyed by vt_symbol.
+
+    Instrument ids are only valid within current process.
+    """
+
+    def __init__(self) -> None:
+        """"""
+        self.ids: dict[str, int] = {}
+        self.vt_symbols: list[str] = []
+        self.keys: list[tuple[str, Exchange]] = []
+
+    def register(self, symbol: str, exchange: Exchange) -> int:
+        """
+        Register instrument and return its id, existing id is returned
+        if already registered.
+        """
+        vt_symbol: str = get_vt_symbol(symbol, exchange)
+
+        instrument_id: int | None = self.ids.get(vt_symbol, None)
+        if instrument_id is None:
+            instrument_id = len(self.vt_symbols)
+            self.ids[vt_symbol] = instrument_id
+            self.vt_symbols.append(vt_symbol)
+            self.keys.append((symbol, exchange))
+
+        return instrument_id
+
+    def get_id(self, vt_symbol: str) -> int:
+        """
+        Get instrument id by vt_symbol, return -1 if not registered.
+        """
+        return self.ids.get(vt_symbol, -1)
+
+    def get_vt_symbol(self, instrument_id: int) -> str:
+        """
+        Get vt_symbol by instrument id.
+        """
+        return self.vt_symbols[instrument_id]
+
+    def get_key(self, instrument_id: int) -> tuple[str, Exchange]:
+        """
+        Get symbol and exchange by instrument id.
+        """
+        return self.keys[instrument_id]
+
+    def __len__(self) -> int:
+        """"""
+        return len(self.vt_symbols)
+
+
 @dataclass
 class BaseData:
     """
     Any data object needs a gateway_name as source
     and should inherit base data.
+
+    Only the high frequency tick/bar data use __slots__ for their own
+    fields, base data keeps a class level default for extra so that
+    other data classes still work with __dict__.
     """
 
     gateway_name: str
@@ -26,7 +111,7 @@ class BaseData:
     extra: dict | None = field(default=None, init=False)
 
 
-@dataclass
+@dataclass(slots=True)
 class TickData(BaseData):
     """
     Tick data contains information about:
@@ -79,12 +164,18 @@ class TickData(BaseData):
 
     localtime: Datetime | None = None
 
+    vt_symbol: str = field(init=False, repr=False, compare=False)
+
+    # Assigned by OmsEngine with InstrumentRegistry, -1 if unknown. Gateway
+    # can also set it in advance to save the lookup of OmsEngine
+    instrument_id: int = field(default=-1, init=False, repr=False, compare=False)
+
     def __post_init__(self) -> None:
         """"""
-        self.vt_symbol: str = f"{self.symbol}.{self.exchange.value}"
+        self.vt_symbol = get_vt_symbol(self.symbol, self.exchange)
 
 
-@dataclass
+@dataclass(slots=True)
 class BarData(BaseData):
     """
     Candlestick bar data of a certain trading period.
@@ -103,9 +194,11 @@ class BarData(BaseData):
     low_price: float = 0
     close_price: float = 0
 
+    vt_symbol: str = field(init=False, repr=False, compare=False)
+
     def __post_init__(self) -> None:
         """"""
-        self.vt_symbol: str = f"{self.symbol}.{self.exchange.value}"
+        self.vt_symbol = get_vt_symbol(self.symbol, self.exchange)
 
 
 @dataclass
@@ -131,9 +224,12 @@ class OrderData(BaseData):
 
     def __post_init__(self) -> None:
         """"""
-        self.vt_symbol: str = f"{self.symbol}.{self.exchange.value}"
+        self.vt_symbol: str = get_vt_symbol(self.symbol, self.exchange)
         self.vt_orderid: str = f"{self.gateway_name}.{self.orderid}"
 
+        # Assigned by OmsEngine with InstrumentRegistry, -1 if unknown
+        self.instrument_id: int = -1
+
     def is_active(self) -> bool:
         """
         Check if the order is active.
@@ -170,7 +266,7 @@ class TradeData(BaseData):
 
     def __post_init__(self) -> None:
         """"""
-        self.vt_symbol: str = f"{self.symbol}.{self.exchange.value}"
+        self.vt_symbol: str = get_vt_symbol(self.symbol, self.exchange)
         self.vt_orderid: str = f"{self.gateway_name}.{self.orderid}"
         self.vt_tradeid: str = f"{self.gateway_name}.{self.tradeid}"
 
@@ -193,7 +289,7 @@ class PositionData(BaseData):
 
     def __post_init__(self) -> None:
         """"""
-        self.vt_symbol: str = f"{self.symbol}.{self.exchange.value}"
+        self.vt_symbol: str = get_vt_symbol(self.symbol, self.exchange)
         self.vt_positionid: str = f"{self.gateway_name}.{self.vt_symbol}.{self.direction.value}"
 
 
@@ -258,7 +354,7 @@ class ContractData(BaseData):
 
     def __post_init__(self) -> None:
         """"""
-        self.vt_symbol: str = f"{self.symbol}.{self.exchange.value}"
+        self.vt_symbol: str = get_vt_symbol(self.symbol, self.exchange)
 
 
 @dataclass
@@ -284,7 +380,7 @@ class QuoteData(BaseData):
 
     def __post_init__(self) -> None:
         """"""
-        self.vt_symbol: str = f"{self.symbol}.{self.exchange.value}"
+        self.vt_symbol: str = get_vt_symbol(self.symbol, self.exchange)
         self.vt_quoteid: str = f"{self.gateway_name}.{self.quoteid}"
 
     def is_active(self) -> bool:
@@ -314,7 +410,7 @@ class SubscribeRequest:
 
     def __post_init__(self) -> None:
         """"""
-        self.vt_symbol: str = f"{self.symbol}.{self.exchange.value}"
+        self.vt_symbol: str = get_vt_symbol(self.symbol, self.exchange)
 
 
 @dataclass
@@ -334,7 +430,7 @@ class OrderRequest:
 
     def __post_init__(self) -> None:
         """"""
-        self.vt_symbol: str = f"{self.symbol}.{self.exchange.value}"
+        self.vt_symbol: str = get_vt_symbol(self.symbol, self.exchange)
 
     def create_order_data(self, orderid: str, gateway_name: str) -> OrderData:
         """
@@ -367,7 +463,7 @@ class CancelRequest:
 
     def __post_init__(self) -> None:
         """"""
-        self.vt_symbol: str = f"{self.symbol}.{self.exchange.value}"
+        self.vt_symbol: str = get_vt_symbol(self.symbol, self.exchange)
 
 
 @dataclass
@@ -384,7 +480,7 @@ class HistoryRequest:
 
     def __post_init__(self) -> None:
         """"""
-        self.vt_symbol: str = f"{self.symbol}.{self.exchange.value}"
+        self.vt_symbol: str = get_vt_symbol(self.symbol, self.exchange)
 
 
 @dataclass
@@ -405,7 +501,7 @@ class QuoteRequest:
 
     def __post_init__(self) -> None:
         """"""
-        self.vt_symbol: str = f"{self.symbol}.{self.exchange.value}"
+        self.vt_symbol: str = get_vt_symbol(self.symbol, self.exchange)
 
     def create_quote_data(self, quoteid: str, gateway_name: str) -> QuoteData:
         """
@@ -425,3 +521,310 @@ class QuoteRequest:
             gateway_name=gateway_name,
         )
         return quote
+
+
+class DataBatch(ABC):
+    """
+    Columnar container of data of one symbol, each numeric field is
+    stored as a contiguous NumPy array with shared header of gateway_name,
+    symbol and exchange.
+
+    Slicing returns a new batch of array views without copying, and data
+    objects are only created when rows are accessed.
+    """
+
+    float_fields: list[str] = []
+
+    def __init__(
+        self,
+        gateway_name: str,
+        symbol: str,
+        exchange: Exchange,
+        datetime: np.ndarray,
+        columns: dict[str, np.ndarray],
+        tz: tzinfo | None = None
+    ) -> None:
+        """
+        Datetime array contains wall time without timezone, which is
+        restored by tz when creating data objects. Missing float columns
+        are filled with zero.
+        """
+        self.gateway_name: str = gateway_name
+        self.symbol: str = symbol
+        self.exchange: Exchange = exchange
+        self.vt_symbol: str = get_vt_symbol(symbol, exchange)
+        self.tz: tzinfo | None = tz
+
+        self.datetime: np.ndarray = np.asarray(datetime, dtype="datetime64[us]")
+
+        size: int = len(self.datetime)
+        self.columns: dict[str, np.ndarray] = {}
+
+        for name in self.float_fields:
+            column: np.ndarray | None = columns.get(name, None)
+
+            if column is None:
+                self.columns[name] = np.zeros(size)
+            else:
+                column = np.asarray(column, dtype=np.float64)
+                if len(column) != size:
+                    raise ValueError(f"Length of column {name} is {len(column)}, but {size} expected")
+                self.columns[name] = column
+
+    def __len__(self) -> int:
+        """"""
+        return len(self.datetime)
+
+    def __getattr__(self, name: str) -> np.ndarray:
+        """
+        Get float column array by field name, e.g. batch.close_price.
+        """
+        columns: dict[str, np.ndarray] | None = self.__dict__.get("columns", None)
+        if columns is not None and name in columns:
+            return columns[name]
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    def __getitem__(self, index: Any) -> Any:
+        """
+        Get data object by int index, or sub batch by slice or array index.
+        """
+        if isinstance(index, (int, np.integer)):
+            return self.get_data(int(index))
+
+        columns: dict[str, np.ndarray] = {k: v[index] for k, v in self.columns.items()}
+        return self._new_batch(self.datetime[index], columns)
+
+    def __iter__(self) -> Iterator:
+        """
+        Iterate data objects, which are created lazily row by row.
+        """
+        for i in range(len(self)):
+            yield self.get_data(i)
+
+    def get_data(self, index: int) -> Any:
+        """
+        Create data object of row.
+        """
+        kwargs: dict = {k: v[index].item() for k, v in self.columns.items()}
+        return self._create_data(index, kwargs)
+
+    def to_list(self) -> list:
+        """
+        Create data objects of all rows.
+        """
+        names: list[str] = list(self.columns.keys())
+        values: list[list] = [v.tolist() for v in self.columns.values()]
+
+        return [
+            self._create_data(i, dict(zip(names, row, strict=True)))
+            for i, row in enumerate(zip(*values, strict=True))
+        ]
+
+    def get_datetime(self, index: int) -> Datetime:
+        """
+        Get datetime of row with timezone.
+        """
+        dt: Datetime = self.datetime[index].item()
+        if self.tz:
+            dt = dt.replace(tzinfo=self.tz)
+        return dt
+
+    def to_polars(self) -> "pl.DataFrame":
+        """
+        Convert into polars DataFrame with datetime and float columns.
+        """
+        import polars as pl
+
+        return pl.DataFrame({"datetime": self.datetime, **self.columns})
+
+    @abstractmethod
+    def _create_data(self, index: int, kwargs: dict) -> Any:
+        """
+        Create data object of row with float field values in kwargs.
+        """
+        pass
+
+    @abstractmethod
+    def _new_batch(self, datetime: np.ndarray, columns: dict[str, np.ndarray]) -> "DataBatch":
+        """
+        Create batch of the same header with sliced arrays.
+        """
+        pass
+
+
+class BarBatch(DataBatch):
+    """
+    Columnar container of bar data.
+    """
+
+    float_fields: list[str] = [
+        f.name for f in fields(BarData) if f.type is float
+    ]
+
+    def __init__(
+        self,
+        gateway_name: str,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval | None,
+        datetime: np.ndarray,
+        columns: dict[str, np.ndarray],
+        tz: tzinfo | None = None
+    ) -> None:
+        """"""
+        super().__init__(gateway_name, symbol, exchange, datetime, columns, tz)
+
+        self.interval: Interval | None = interval
+
+    @classmethod
+    def from_bars(cls, bars: list[BarData]) -> "BarBatch":
+        """
+        Create batch from bar data list of the same symbol.
+        """
+        if not bars:
+            raise ValueError("Bar data list is empty")
+
+        bar: BarData = bars[0]
+
+        return cls(
+            bar.gateway_name,
+            bar.symbol,
+            bar.exchange,
+            bar.interval,
+            np.array([b.datetime.replace(tzinfo=None) for b in bars], dtype="datetime64[us]"),
+            {name: np.array([getattr(b, name) for b in bars], dtype=np.float64) for name in cls.float_fields},
+            bar.datetime.tzinfo
+        )
+
+    @classmethod
+    def from_polars(
+        cls,
+        df: "pl.DataFrame",
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval | None,
+        gateway_name: str = "DB",
+        tz: tzinfo | None = None
+    ) -> "BarBatch":
+        """
+        Create batch from polars DataFrame with datetime column and float
+        columns named by BarData fields.
+        """
+        columns: dict[str, np.ndarray] = {
+            name: df[name].to_numpy() for name in cls.float_fields if name in df.columns
+        }
+        datetime: np.ndarray = df["datetime"].dt.replace_time_zone(None).to_numpy()
+
+        return cls(gateway_name, symbol, exchange, interval, datetime, columns, tz)
+
+    def _create_data(self, index: int, kwargs: dict) -> BarData:
+        """"""
+        return BarData(
+            gateway_name=self.gateway_name,
+            symbol=self.symbol,
+            exchange=self.exchange,
+            datetime=self.get_datetime(index),
+            interval=self.interval,
+            **kwargs
+        )
+
+    def _new_batch(self, datetime: np.ndarray, columns: dict[str, np.ndarray]) -> "BarBatch":
+        """"""
+        return BarBatch(
+            self.gateway_name,
+            self.symbol,
+            self.exchange,
+            self.interval,
+            datetime,
+            columns,
+            self.tz
+        )
+
+
+class TickBatch(DataBatch):
+    """
+    Columnar container of tick data, localtime is not kept.
+    """
+
+    float_fields: list[str] = [
+        f.name for f in fields(TickData) if f.type is float
+    ]
+
+    def __init__(
+        self,
+        gateway_name: str,
+        symbol: str,
+        exchange: Exchange,
+        datetime: np.ndarray,
+        columns: dict[str, np.ndarray],
+        tz: tzinfo | None = None,
+        name: str = ""
+    ) -> None:
+        """"""
+        super().__init__(gateway_name, symbol, exchange, datetime, columns, tz)
+
+        self.name: str = name
+
+    @classmethod
+    def from_ticks(cls, ticks: list[TickData]) -> "TickBatch":
+        """
+        Create batch from tick data list of the same symbol.
+        """
+        if not ticks:
+            raise ValueError("Tick data list is empty")
+
+        tick: TickData = ticks[0]
+
+        return cls(
+            tick.gateway_name,
+            tick.symbol,
+            tick.exchange,
+            np.array([t.datetime.replace(tzinfo=None) for t in ticks], dtype="datetime64[us]"),
+            {name: np.array([getattr(t, name) for t in ticks], dtype=np.float64) for name in cls.float_fields},
+            tick.datetime.tzinfo,
+            tick.name
+        )
+
+    @classmethod
+    def from_polars(
+        cls,
+        df: "pl.DataFrame",
+        symbol: str,
+        exchange: Exchange,
+        gateway_name: str = "DB",
+        tz: tzinfo | None = None,
+        name: str = ""
+    ) -> "TickBatch":
+        """
+        Create batch from polars DataFrame with datetime column and float
+        columns named by TickData fields.
+        """
+        columns: dict[str, np.ndarray] = {
+            n: df[n].to_numpy() for n in cls.float_fields if n in df.columns
+        }
+        datetime: np.ndarray = df["datetime"].dt.replace_time_zone(None).to_numpy()
+
+        return cls(gateway_name, symbol, exchange, datetime, columns, tz, name)
+
+    def _create_data(self, index: int, kwargs: dict) -> TickData:
+        """"""
+        return TickData(
+            gateway_name=self.gateway_name,
+            symbol=self.symbol,
+            exchange=self.exchange,
+            datetime=self.get_datetime(index),
+            name=self.name,
+            **kwargs
+        )
+
+    def _new_batch(self, datetime: np.ndarray, columns: dict[str, np.ndarray]) -> "TickBatch":
+        """"""
+        return TickBatch(
+            self.gateway_name,
+            self.symbol,
+            self.exchange,
+            datetime,
+            columns,
+            self.tz,
+            self.name
+        )
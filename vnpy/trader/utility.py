@@ -8,17 +8,19 @@ from datetime import datetime, time
 from pathlib import Path
 from collections.abc import Callable
 from decimal import Decimal
+from functools import cache
 from math import floor, ceil
 
 import numpy as np
 import talib
 from zoneinfo import ZoneInfo, available_timezones      # noqa
 
-from .object import BarData, TickData
+from .object import BarData, TickData, get_vt_symbol
 from .constant import Exchange, Interval
 from .locale import _
 
 
+@cache
 def extract_vt_symbol(vt_symbol: str) -> tuple[str, Exchange]:
     """
     :return: (symbol, exchange)
@@ -31,7 +33,7 @@ def generate_vt_symbol(symbol: str, exchange: Exchange) -> str:
     """
     return vt_symbol
     """
-    return f"{symbol}.{exchange.value}"
+    return get_vt_symbol(symbol, exchange)
 
 
 def _get_trader_dir(temp_name: str) -> tuple[Path, Path]: